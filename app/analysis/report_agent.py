@@ -1,16 +1,20 @@
 import json
 import os
 from collections import defaultdict
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Iterable, List, Tuple
 
 from dotenv import load_dotenv
 from openai import OpenAI
 
+from app.embeddings.stability import STABILITY_KEY
+
 
 load_dotenv()
 
 
+@lru_cache(maxsize=1)
 def _client() -> OpenAI:
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
@@ -45,6 +49,33 @@ def _confusion_pairs(cluster_labels: Dict[str, int]) -> Dict[Tuple[str, str], in
     return counts
 
 
+def _stability_context(stability: Dict | None) -> Dict | None:
+    # Compact view of the bootstrap/permutation results for question 4
+    if not stability or stability.get("error"):
+        return None
+    return {
+        "dominant_factor": stability.get("dominant_factor"),
+        "alpha": stability.get("alpha"),
+        "interpreter_significant": stability.get("interpreter_significant"),
+        "model_significant": stability.get("model_significant"),
+        "interpreter_effect_z": stability.get("interpreter_effect_z"),
+        "model_effect_z": stability.get("model_effect_z"),
+        "n_resamples": stability.get("n_resamples"),
+        "models": {
+            model: {
+                "silhouette_by_sign": m["silhouette_by_sign"]["observed"],
+                "silhouette_by_sign_p": m["silhouette_by_sign"]["permutation_p_value"],
+                "silhouette_by_interpreter": m["silhouette_by_interpreter"]["observed"],
+                "silhouette_by_interpreter_p": m["silhouette_by_interpreter"]["permutation_p_value"],
+                "kmeans_ari_vs_interpreter": m["kmeans_ari_vs_interpreter"]["mean"],
+                "kmeans_ari_vs_sign": m["kmeans_ari_vs_sign"]["mean"],
+            }
+            for model, m in stability.get("models", {}).items()
+        },
+        "model_pairs": stability.get("model_pairs"),
+    }
+
+
 def _build_context(analysis: Dict) -> Dict:
     # Compute best model by silhouette and confusion pairs per model
     best_model = None
@@ -53,6 +84,8 @@ def _build_context(analysis: Dict) -> Dict:
     global_confusions: Dict[Tuple[str, str], int] = defaultdict(int)
 
     for model, data in analysis.items():
+        if model == STABILITY_KEY:
+            continue
         sil = data.get("silhouette")
         used_k = data.get("used_k")
         pca_ratio = data.get("pca_explained_variance_ratio")
@@ -78,6 +111,7 @@ def _build_context(analysis: Dict) -> Dict:
         "best_silhouette": best_sil if best_sil >= 0 else None,
         "models": model_summaries,
         "top_confused_pairs": top_confused_serialized,
+        "interpreter_vs_model": _stability_context(analysis.get(STABILITY_KEY)),
     }
 
 
@@ -108,7 +142,8 @@ def generate_final_report(date: str, analysis_report_path: str, output_md_path:
 
     prompt = (
         "Genera un informe en Markdown que responda exactamente estas 4 preguntas, con secciones claras "
-        "(usa títulos H3), conclusiones concisas y referencias a métricas (k, silhouette, varianza explicada).\n\n"
+        "(usa títulos H3), conclusiones concisas y referencias a métricas (k, silhouette, varianza explicada). "
+        "Para la pregunta 4 usa `interpreter_vs_model` (bootstrap y permutaciones sobre embeddings por fuente) si está disponible.\n\n"
         "Preguntas:\n"
         "1. ¿Qué embedding separa mejor los signos?\n"
         "2. ¿Se observa agrupamiento claro en PCA?\n"
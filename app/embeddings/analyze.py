@@ -8,12 +8,16 @@ from sklearn.cluster import KMeans
 from sklearn.decomposition import PCA
 from sklearn.metrics import silhouette_score
 
+from app.embeddings.storage import StoredEmbeddings, to_float32
 
-def analyze_embeddings(embeddings_by_model: Dict[str, np.ndarray], signs: list[str]) -> Dict[str, dict]:
+
+def analyze_embeddings(embeddings_by_model: Dict[str, StoredEmbeddings], signs: list[str]) -> Dict[str, dict]:
     os.makedirs("outputs", exist_ok=True)
     report: Dict[str, dict] = {}
 
-    for model, X in embeddings_by_model.items():
+    for model, stored in embeddings_by_model.items():
+        # float16 / int8 matrices are dequantized to float32 before PCA/KMeans
+        X = to_float32(stored)
         n_samples = int(X.shape[0])
         if n_samples == 0:
             report[model] = {
@@ -0,0 +1,170 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+from typing import Dict, List
+
+import numpy as np
+from sklearn.cluster import KMeans
+from sklearn.metrics import adjusted_rand_score, silhouette_score
+
+from app.embeddings.build_embeddings import _embed_models
+from app.embeddings.storage import (
+    STORAGE_FORMATS,
+    QuantizedEmbeddings,
+    StoredEmbeddings,
+    encode,
+    load_embeddings,
+    reduce_dimensions,
+    save_embeddings,
+    to_float32,
+)
+
+
+# Native output width per model; a narrower matrix in data/ was produced with `dimensions` (--embed-dimensions)
+_FULL_WIDTH = {"text-embedding-3-large": 3072, "text-embedding-3-small": 1536, "text-embedding-ada-002": 1536}
+
+
+def _reference_issues(model: str, loaded: StoredEmbeddings) -> List[str]:
+    # load_embeddings decodes according to embeddings_<model>.meta.json, so the loaded type is the stored format
+    issues = []
+    storage = "int8" if isinstance(loaded, QuantizedEmbeddings) else str(loaded.dtype)
+    if storage != "float32":
+        issues.append(f"stored as {storage}, not float32")
+    full = _FULL_WIDTH.get(model)
+    if full is not None and loaded.shape[1] < full:
+        issues.append(f"{loaded.shape[1]} dimensions, the model's full width is {full}")
+    return issues
+
+
+def _cluster(X: np.ndarray, k: int) -> np.ndarray:
+    return KMeans(n_clusters=k, n_init=20, random_state=42).fit_predict(X)
+
+
+def _cosine_matrix(X: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(X, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    Xn = X / norms
+    return Xn @ Xn.T
+
+
+def benchmark_storage(
+    reference: np.ndarray,
+    *,
+    dimensions: List[int | None],
+    storages: List[str],
+    k: int = 4,
+    load_repeats: int = 5,
+) -> List[Dict]:
+    """
+    Compara cada combinación (dimensions, storage) contra el embedding float32 completo:
+    bytes en disco/memoria, tiempo de carga, silhouette y acuerdo de clusters (ARI).
+    """
+    reference = np.asarray(reference, dtype=np.float32)
+    n_samples = int(reference.shape[0])
+    k = max(2, min(k, n_samples - 1))
+    ref_labels = _cluster(reference, k)
+    ref_cos = _cosine_matrix(reference)
+    iu = np.triu_indices(n_samples, k=1)
+
+    rows: List[Dict] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for dims in dimensions:
+            reduced = reduce_dimensions(reference, dims)
+            for storage in storages:
+                name = f"bench_{reduced.shape[1]}_{storage}"
+                stored = encode(reduced, storage)
+                path = save_embeddings(name, stored, [str(i) for i in range(n_samples)], data_dir=tmp, write_csv=False)
+
+                load_times = []
+                for _ in range(max(1, load_repeats)):
+                    t0 = time.perf_counter()
+                    loaded = load_embeddings(name, data_dir=tmp, storage=storage)
+                    X = to_float32(loaded)
+                    load_times.append(time.perf_counter() - t0)
+
+                labels = _cluster(X, k)
+                sil = float(silhouette_score(X, labels)) if len(set(labels)) > 1 else None
+                cos_corr = float(np.corrcoef(ref_cos[iu], _cosine_matrix(X)[iu])[0, 1]) if n_samples > 2 else None
+                rows.append(
+                    {
+                        "dimensions": int(reduced.shape[1]),
+                        "storage": storage,
+                        "file_bytes": os.path.getsize(path),
+                        "memory_bytes": int(stored.nbytes),
+                        "load_ms": min(load_times) * 1000.0,
+                        "used_k": k,
+                        "silhouette": sil,
+                        "adjusted_rand_vs_reference": float(adjusted_rand_score(ref_labels, labels)),
+                        "cosine_similarity_correlation": cos_corr,
+                    }
+                )
+    return rows
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark de dimensiones y formatos de almacenamiento de embeddings")
+    parser.add_argument("--models", nargs="+", default=list(_embed_models()), help="Modelos con embeddings en data/")
+    parser.add_argument(
+        "--dimensions",
+        nargs="+",
+        type=int,
+        default=[0, 1024, 512, 256],
+        help="Dimensiones a evaluar (0 = ancho completo)",
+    )
+    parser.add_argument("--storage", nargs="+", choices=STORAGE_FORMATS, default=list(STORAGE_FORMATS))
+    # Not the pipeline's k = min(12, n): with one row per sign that is k = n, every sign is its own cluster,
+    # ARI against the reference is always 1 and silhouette is undefined, so no degradation would show up
+    parser.add_argument(
+        "--k",
+        type=int,
+        default=4,
+        help="Clusters de KMeans para silhouette/ARI (menos que signos: con k = n, como en el pipeline, ARI siempre es 1)",
+    )
+    parser.add_argument(
+        "--allow-degraded-reference",
+        action="store_true",
+        help="Corre aunque los embeddings de data/ no sean float32 de ancho completo (solo avisa)",
+    )
+    parser.add_argument("--data-dir", type=str, default="data")
+    parser.add_argument("--output", type=str, default="outputs/embedding_storage_benchmark.json")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    dims = [d or None for d in args.dimensions]
+    report: Dict[str, Dict] = {}
+    for model in args.models:
+        loaded = load_embeddings(model, data_dir=args.data_dir)
+        issues = _reference_issues(model, loaded)
+        if issues:
+            message = (
+                f"{model}: the reference in {args.data_dir} is not the full float32 embedding ({'; '.join(issues)}). "
+                "Regenerate it with main.py without --embed-storage/--embed-dimensions"
+            )
+            if not args.allow_degraded_reference:
+                raise SystemExit(f"[BENCH ❌] {message}, or pass --allow-degraded-reference.")
+            print(f"[BENCH ⚠️] {message}; comparing against it anyway.")
+        reference = to_float32(loaded)
+        rows = benchmark_storage(reference, dimensions=dims, storages=args.storage, k=args.k)
+        report[model] = {
+            "reference": {"dimensions": int(reference.shape[1]), "degraded": issues},
+            "results": rows,
+        }
+        for row in rows:
+            print(
+                f"[BENCH] {model} d={row['dimensions']} {row['storage']}: "
+                f"{row['file_bytes']} B, load {row['load_ms']:.2f} ms, "
+                f"silhouette={row['silhouette']}, ARI={row['adjusted_rand_vs_reference']:.3f}"
+            )
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Benchmark: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
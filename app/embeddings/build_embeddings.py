@@ -1,15 +1,20 @@
 import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 from typing import Dict, List, Tuple
 
 import numpy as np
-import pandas as pd
 from dotenv import load_dotenv
 from openai import OpenAI
 
+from app.embeddings.storage import StoredEmbeddings, encode, save_embeddings
+
 
 load_dotenv()
 
 
+@lru_cache(maxsize=1)
 def _client() -> OpenAI:
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
@@ -23,25 +28,97 @@ def _embed_models() -> Tuple[str, str]:
     return large, small
 
 
-def build_embeddings(sign_to_text: Dict[str, str]) -> Dict[str, np.ndarray]:
+def _embed_dimensions() -> int | None:
+    value = os.getenv("OPENAI_EMBED_DIMENSIONS")
+    return int(value) if value else None
+
+
+def _embed_storage() -> str:
+    return os.getenv("OPENAI_EMBED_STORAGE", "float32")
+
+
+def _embed_batch(client: OpenAI, model: str, texts: List[str], dimensions: int | None) -> List[List[float]]:
+    kwargs = {"dimensions": dimensions} if dimensions else {}
+    resp = client.embeddings.create(model=model, input=texts, **kwargs)
+    return [d.embedding for d in resp.data]
+
+
+# Per-process cache of text embeddings: the source-agreement gate and the per-source stability analysis
+# embed the same summaries, so the second one is served from here instead of a new API call
+_EMBED_CACHE: "OrderedDict[Tuple[str, int | None, str], List[float]]" = OrderedDict()
+_EMBED_CACHE_MAX = 4096
+_EMBED_CACHE_LOCK = threading.Lock()
+
+
+def embed_texts(texts: List[str], *, model: str | None = None, dimensions: int | None = None) -> np.ndarray:
+    """Embeddings (float32, una fila por texto) con caché por (modelo, dimensiones, texto); solo pide los que faltan."""
+    model = model or _embed_models()[1]
+    dimensions = dimensions or _embed_dimensions()
+    found: Dict[str, List[float]] = {}
+    with _EMBED_CACHE_LOCK:
+        for text in dict.fromkeys(texts):
+            key = (model, dimensions, text)
+            if key in _EMBED_CACHE:
+                _EMBED_CACHE.move_to_end(key)
+                found[text] = _EMBED_CACHE[key]
+    missing = [t for t in dict.fromkeys(texts) if t not in found]
+    if missing:
+        found.update(zip(missing, _embed_batch(_client(), model, missing, dimensions)))
+        with _EMBED_CACHE_LOCK:
+            for text in missing:
+                _EMBED_CACHE[(model, dimensions, text)] = found[text]
+            while len(_EMBED_CACHE) > _EMBED_CACHE_MAX:
+                _EMBED_CACHE.popitem(last=False)
+    return np.array([found[t] for t in texts], dtype=np.float32)
+
+
+def build_embeddings(
+    sign_to_text: Dict[str, str],
+    *,
+    dimensions: int | None = None,
+    storage: str | None = None,
+    data_dir: str = "data",
+) -> Dict[str, StoredEmbeddings]:
+    """
+    dimensions: tamaño de salida pedido a la API (None = ancho completo del modelo)
+    storage: 'float32' | 'float16' | 'int8' (cuantización escalar por dimensión)
+    """
     client = _client()
     model_large, model_small = _embed_models()
-
-    def embed_batch(model: str, texts: List[str]) -> List[List[float]]:
-        resp = client.embeddings.create(model=model, input=texts)
-        return [d.embedding for d in resp.data]
+    dimensions = dimensions or _embed_dimensions()
+    storage = storage or _embed_storage()
 
     signs_sorted = sorted(sign_to_text.keys())
     texts = [sign_to_text[s] for s in signs_sorted]
 
+    out: Dict[str, StoredEmbeddings] = {}
+    for model in [model_large, model_small]:
+        vectors = _embed_batch(client, model, texts, dimensions)
+        stored = encode(np.array(vectors, dtype=np.float32), storage)
+        out[model] = stored
+        # Save NPY/NPZ + CSV with sign labels
+        save_embeddings(model, stored, signs_sorted, data_dir=data_dir)
+    return out
+
+
+def build_source_embeddings(
+    items: List[Tuple[str, str, str]],
+    *,
+    dimensions: int | None = None,
+    data_dir: str = "data",
+) -> Dict[str, np.ndarray]:
+    """
+    items: (sign, interpreter, text) por resumen de fuente; una fila por item en el mismo orden.
+    Se guardan como data/embeddings_sources_{model}.* con etiquetas "sign@interpreter".
+    """
+    model_large, model_small = _embed_models()
+    texts = [text for _, _, text in items]
+    labels = [f"{sign}@{interp}" for sign, interp, _ in items]
+
     out: Dict[str, np.ndarray] = {}
     for model in [model_large, model_small]:
-        vectors = embed_batch(model, texts)
-        arr = np.array(vectors, dtype=np.float32)
+        # The small model's vectors are usually already cached by the source-agreement gate
+        arr = embed_texts(texts, model=model, dimensions=dimensions)
         out[model] = arr
-        # Save CSV/NPY with sign labels
-        df = pd.DataFrame(arr)
-        df.insert(0, "sign", signs_sorted)
-        df.to_csv(f"data/embeddings_{model}.csv", index=False)
-        np.save(f"data/embeddings_{model}.npy", arr)
+        save_embeddings(f"sources_{model}", arr, labels, data_dir=data_dir, write_csv=False)
     return out
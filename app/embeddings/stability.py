@@ -0,0 +1,398 @@
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from app.embeddings.build_embeddings import build_source_embeddings
+
+
+# Key under which the results are stored in outputs/analysis_report.json (next to the per-model entries)
+STABILITY_KEY = "interpreter_vs_model"
+
+_CHUNK = 250
+
+
+def load_source_summaries(date: str, signs: List[str], *, summaries_dir: str = "data/summaries") -> List[Tuple[str, str, str]]:
+    """(sign, interpreter, final_summary) por cada resumen de fuente no vacío en data/summaries/<date>/."""
+    items: List[Tuple[str, str, str]] = []
+    for sign in signs:
+        path = Path(summaries_dir) / date / f"{sign}.json"
+        if not path.exists():
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            artifact = json.load(f)
+        for s in artifact.get("summaries", []):
+            text = (s.get("final_summary") or "").strip()
+            if text:
+                items.append((sign, s.get("interpreter") or "", text))
+    return items
+
+
+def _encode_labels(values: List[str]) -> Tuple[np.ndarray, List[str]]:
+    names = sorted(set(values))
+    index = {v: i for i, v in enumerate(names)}
+    return np.array([index[v] for v in values], dtype=np.int64), names
+
+
+def _project(X: np.ndarray) -> np.ndarray:
+    # n points span at most n-1 dimensions: projecting onto the centered SVD basis keeps
+    # every pairwise distance exact while shrinking d (3072) to <= n for the batched math.
+    Xc = np.asarray(X, dtype=np.float64) - np.mean(X, axis=0, keepdims=True)
+    U, S, _ = np.linalg.svd(Xc, full_matrices=False)
+    return U * S
+
+
+def _distances(Z: np.ndarray) -> np.ndarray:
+    sq = np.sum(Z * Z, axis=1)
+    return np.sqrt(np.maximum(sq[:, None] + sq[None, :] - 2.0 * Z @ Z.T, 0.0))
+
+
+def _subsample_masks(rng: np.random.Generator, n_resamples: int, n: int, size: int) -> np.ndarray:
+    ranks = np.argsort(np.argsort(rng.random((n_resamples, n)), axis=1), axis=1)
+    return (ranks < size).astype(np.float64)
+
+
+def batched_silhouette(D: np.ndarray, onehot: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """
+    Silhouette media por remuestreo, sin bucles de Python.
+    D: (n, n) distancias; onehot: (n, k) o (B, n, k) etiquetas; mask: (B, n) puntos incluidos.
+    Devuelve (B,), NaN donde hay menos de 2 etiquetas o tantas etiquetas como puntos.
+    """
+    B, n = mask.shape
+    if onehot.ndim == 2:
+        onehot = np.broadcast_to(onehot, (B,) + onehot.shape)
+    sums = np.einsum("ij,bj,bjk->bik", D, mask, onehot, optimize=True)
+    counts = np.einsum("bj,bjk->bk", mask, onehot)
+    own_count = np.einsum("bik,bk->bi", onehot, counts)
+
+    a = np.einsum("bik,bik->bi", sums, onehot) / np.maximum(own_count - 1, 1)
+    other = (onehot == 0) & (counts[:, None, :] > 0)
+    b = np.where(other, sums / np.maximum(counts[:, None, :], 1), np.inf).min(axis=2)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        s = (b - a) / np.maximum(np.maximum(a, b), 1e-12)
+    # Singleton clusters score 0, as in sklearn
+    s = np.where((mask > 0) & (own_count > 1) & np.isfinite(s), s, 0.0)
+
+    n_points = mask.sum(axis=1)
+    n_labels = (counts > 0).sum(axis=1)
+    out = s.sum(axis=1) / np.maximum(n_points, 1)
+    return np.where((n_labels >= 2) & (n_labels < n_points), out, np.nan)
+
+
+def batched_kmeans(Z: np.ndarray, mask: np.ndarray, k: int, rng: np.random.Generator, *, n_iter: int = 30) -> np.ndarray:
+    """Lloyd en lote: un K-Means por remuestreo, iniciado en k puntos distintos del remuestreo. Devuelve (B, n)."""
+    B, n = mask.shape
+    keys = np.where(mask > 0, rng.random((B, n)), 2.0)
+    centroids = Z[np.argsort(keys, axis=1)[:, :k]]  # (B, k, r)
+    eye = np.eye(k)
+    labels = np.zeros((B, n), dtype=np.int64)
+    for it in range(n_iter):
+        d2 = np.sum((Z[None, :, None, :] - centroids[:, None, :, :]) ** 2, axis=3)
+        new_labels = d2.argmin(axis=2)
+        if it > 0 and np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        onehot = eye[labels] * mask[:, :, None]
+        counts = onehot.sum(axis=1)
+        means = np.einsum("bnk,nr->bkr", onehot, Z) / np.maximum(counts, 1)[:, :, None]
+        centroids = np.where(counts[:, :, None] > 0, means, centroids)
+    return labels
+
+
+def batched_adjusted_rand(la: np.ndarray, ka: int, lb: np.ndarray, kb: int, mask: np.ndarray) -> np.ndarray:
+    """ARI por remuestreo a partir de tablas de contingencia en lote; la/lb: (n,) o (B, n)."""
+    B, n = mask.shape
+    A = np.eye(ka)[np.broadcast_to(la, (B, n))] * mask[:, :, None]
+    Bm = np.eye(kb)[np.broadcast_to(lb, (B, n))]
+    table = np.einsum("bni,bnj->bij", A, Bm)
+
+    def comb2(x: np.ndarray) -> np.ndarray:
+        return x * (x - 1) / 2.0
+
+    sum_ij = comb2(table).sum(axis=(1, 2))
+    sum_a = comb2(table.sum(axis=2)).sum(axis=1)
+    sum_b = comb2(table.sum(axis=1)).sum(axis=1)
+    total = comb2(mask.sum(axis=1))
+    expected = sum_a * sum_b / np.maximum(total, 1)
+    max_index = (sum_a + sum_b) / 2.0
+    denom = max_index - expected
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ari = (sum_ij - expected) / denom
+    # Degenerate partitions (e.g. all singletons on both sides) count as perfect agreement, as in sklearn
+    return np.where(np.abs(denom) < 1e-12, 1.0, ari)
+
+
+def _resample_chunk(args: Tuple) -> Dict[str, np.ndarray]:
+    projected, sign_ids, interp_ids, k, size, n_resamples, seed = args
+    rng = np.random.default_rng(seed)
+    n = len(sign_ids)
+    n_signs = int(sign_ids.max()) + 1
+    n_interps = int(interp_ids.max()) + 1
+    sign_oh = np.eye(n_signs)[sign_ids]
+    interp_oh = np.eye(n_interps)[interp_ids]
+
+    masks = _subsample_masks(rng, n_resamples, n, size)
+    full = np.ones((n_resamples, n))
+    perm = np.argsort(rng.random((n_resamples, n)), axis=1)
+
+    out: Dict[str, np.ndarray] = {}
+    partitions: Dict[str, np.ndarray] = {}
+    for model, Z in projected.items():
+        D = _distances(Z)
+        out[f"{model}|sil_sign"] = batched_silhouette(D, sign_oh, masks)
+        out[f"{model}|sil_interpreter"] = batched_silhouette(D, interp_oh, masks)
+        # Null distributions: labels shuffled over all points
+        out[f"{model}|perm_sil_sign"] = batched_silhouette(D, np.eye(n_signs)[sign_ids[perm]], full)
+        out[f"{model}|perm_sil_interpreter"] = batched_silhouette(D, np.eye(n_interps)[interp_ids[perm]], full)
+
+        labels = batched_kmeans(Z, masks, k, rng)
+        partitions[model] = labels
+        out[f"{model}|ari_sign"] = batched_adjusted_rand(labels, k, sign_ids, n_signs, masks)
+        out[f"{model}|ari_interpreter"] = batched_adjusted_rand(labels, k, interp_ids, n_interps, masks)
+
+    models = list(projected)
+    for i in range(len(models)):
+        for j in range(i + 1, len(models)):
+            out[f"{models[i]}~{models[j]}|ari_models"] = batched_adjusted_rand(
+                partitions[models[i]], k, partitions[models[j]], k, masks
+            )
+    return out
+
+
+def _summary(values: np.ndarray) -> Dict:
+    values = values[np.isfinite(values)]
+    if values.size == 0:
+        return {"mean": None, "std": None, "ci95": None, "n": 0}
+    lo, hi = np.percentile(values, [2.5, 97.5])
+    return {"mean": float(values.mean()), "std": float(values.std()), "ci95": [float(lo), float(hi)], "n": int(values.size)}
+
+
+def _p_value(null: np.ndarray, observed: float) -> float:
+    null = null[np.isfinite(null)]
+    return float((1 + np.sum(null >= observed)) / (null.size + 1))
+
+
+def _z_vs_null(null: np.ndarray, observed: float) -> float | None:
+    null = null[np.isfinite(null)]
+    if null.size < 2 or null.std() == 0:
+        return None
+    return float((observed - null.mean()) / null.std())
+
+
+def _subsampling_interval(values: np.ndarray, observed: float, size: int, n: int) -> Dict:
+    """
+    Intervalo del estadístico a tamaño completo a partir de submuestras de tamaño `size` (Politis-Romano):
+    la dispersión de las submuestras se reescala por sqrt(size / (n - size)) antes de centrarla en `observed`.
+    """
+    values = values[np.isfinite(values)]
+    if values.size < 2 or size >= n:
+        return {"observed": observed, "ci95": None, "std": None}
+    scale = np.sqrt(size / (n - size))
+    dev = (values - observed) * scale
+    lo, hi = np.percentile(dev, [2.5, 97.5])
+    return {"observed": observed, "ci95": [float(observed - hi), float(observed - lo)], "std": float(dev.std())}
+
+
+def _dominant_factor(models: Dict[str, Dict], model_pairs: Dict[str, Dict], *, alpha: float) -> Dict:
+    """
+    Veredicto para la pregunta 4 comparando señal contra ruido en ambos lados:
+    - intérprete: silhouette por intérprete por encima de su nulo de permutación (p < alpha), en algún modelo;
+      el tamaño del efecto es su z contra la distribución permutada.
+    - modelo: la diferencia pareada de silhouette por signo tiene un IC95 que excluye 0 y el mejor modelo
+      separa signos mejor que el azar (si ninguno lo hace, la diferencia entre ellos es ruido);
+      el tamaño del efecto es |diferencia| / desviación del intervalo.
+    Con ambos significativos gana el z mayor; sin ninguno, 'inconclusive'.
+    Los tests por modelo usan alpha corregido por Bonferroni (alpha / número de modelos).
+    """
+    alpha_model = alpha / max(1, len(models))
+    interp_z = [
+        m["silhouette_by_interpreter"]["z_vs_permutation"] or 0.0
+        for m in models.values()
+        if m["silhouette_by_interpreter"]["permutation_p_value"] < alpha_model
+    ]
+    interpreter_effect = max(interp_z) if interp_z else None
+
+    model_z = []
+    for pair, p in model_pairs.items():
+        diff = p["silhouette_by_sign_difference"]
+        if not diff["ci95"] or not diff["std"]:
+            continue
+        lo, hi = diff["ci95"]
+        better = pair.split(" vs ")[0 if diff["observed"] > 0 else 1]
+        if (lo > 0 or hi < 0) and models[better]["silhouette_by_sign"]["permutation_p_value"] < alpha_model:
+            model_z.append(abs(diff["observed"]) / diff["std"])
+    model_effect = max(model_z) if model_z else None
+
+    if interpreter_effect is None and model_effect is None:
+        dominant = "inconclusive"
+    elif model_effect is None or (interpreter_effect is not None and interpreter_effect >= model_effect):
+        dominant = "interpreter"
+    else:
+        dominant = "embedding_model"
+    return {
+        "alpha": alpha,
+        "interpreter_significant": interpreter_effect is not None,
+        "model_significant": model_effect is not None,
+        "interpreter_effect_z": interpreter_effect,
+        "model_effect_z": model_effect,
+        "dominant_factor": dominant,
+    }
+
+
+def stability_analysis(
+    embeddings_by_model: Dict[str, np.ndarray],
+    signs: List[str],
+    interpreters: List[str],
+    *,
+    n_resamples: int = 2000,
+    fraction: float = 0.8,
+    seed: int = 42,
+    n_jobs: int | None = None,
+    alpha: float = 0.05,
+) -> Dict:
+    """
+    Bootstrap (submuestreo sin reemplazo) y test de permutación sobre embeddings por (signo, intérprete):
+    silhouette por signo y por intérprete, ARI de K-Means contra cada partición y ARI entre modelos.
+    Los remuestreos se reparten en bloques de tamaño fijo con semillas derivadas de `seed`, así el resultado
+    no depende de `n_jobs`.
+    """
+    started = time.perf_counter()
+    sign_ids, sign_names = _encode_labels(signs)
+    interp_ids, interp_names = _encode_labels(interpreters)
+    n = len(signs)
+    if n < 4 or len(sign_names) < 2 or len(interp_names) < 2:
+        return {
+            "error": "insufficient_sources",
+            "message": "Se necesitan al menos 2 signos y 2 intérpretes con resumen",
+            "n_samples": n,
+        }
+
+    size = max(3, min(n - 1, int(round(fraction * n))))
+    k = max(2, min(len(sign_names), size - 1))
+    projected = {model: _project(X) for model, X in embeddings_by_model.items()}
+
+    n_chunks = -(-n_resamples // _CHUNK)
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+    tasks = [
+        (projected, sign_ids, interp_ids, k, size, min(_CHUNK, n_resamples - i * _CHUNK), seeds[i])
+        for i in range(n_chunks)
+    ]
+    n_jobs = max(1, min(n_jobs or os.cpu_count() or 1, n_chunks))
+    if n_jobs == 1:
+        chunks = [_resample_chunk(t) for t in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            chunks = list(pool.map(_resample_chunk, tasks))
+    results = {key: np.concatenate([c[key] for c in chunks]) for key in chunks[0]}
+
+    all_points = np.ones((1, n))
+    models: Dict[str, Dict] = {}
+    for model, Z in projected.items():
+        D = _distances(Z)
+        observed_sign = float(batched_silhouette(D, np.eye(len(sign_names))[sign_ids], all_points)[0])
+        observed_interp = float(batched_silhouette(D, np.eye(len(interp_names))[interp_ids], all_points)[0])
+        models[model] = {
+            "silhouette_by_sign": {
+                "observed": observed_sign,
+                "bootstrap": _summary(results[f"{model}|sil_sign"]),
+                "permutation_p_value": _p_value(results[f"{model}|perm_sil_sign"], observed_sign),
+                "z_vs_permutation": _z_vs_null(results[f"{model}|perm_sil_sign"], observed_sign),
+            },
+            "silhouette_by_interpreter": {
+                "observed": observed_interp,
+                "bootstrap": _summary(results[f"{model}|sil_interpreter"]),
+                "permutation_p_value": _p_value(results[f"{model}|perm_sil_interpreter"], observed_interp),
+                "z_vs_permutation": _z_vs_null(results[f"{model}|perm_sil_interpreter"], observed_interp),
+            },
+            "kmeans_ari_vs_sign": _summary(results[f"{model}|ari_sign"]),
+            "kmeans_ari_vs_interpreter": _summary(results[f"{model}|ari_interpreter"]),
+        }
+
+    model_names = list(projected)
+    model_pairs: Dict[str, Dict] = {}
+    for i in range(len(model_names)):
+        for j in range(i + 1, len(model_names)):
+            a, b = model_names[i], model_names[j]
+            observed_diff = models[a]["silhouette_by_sign"]["observed"] - models[b]["silhouette_by_sign"]["observed"]
+            diff = _subsampling_interval(results[f"{a}|sil_sign"] - results[f"{b}|sil_sign"], observed_diff, size, n)
+            model_pairs[f"{a} vs {b}"] = {
+                "kmeans_ari_between_models": _summary(results[f"{a}~{b}|ari_models"]),
+                # Paired on the same resamples: positive means the first model separates signs better
+                "silhouette_by_sign_difference": diff,
+            }
+
+    verdict = _dominant_factor(models, model_pairs, alpha=alpha)
+    return {
+        "n_samples": n,
+        "signs": sign_names,
+        "interpreters": interp_names,
+        "n_resamples": n_resamples,
+        "subsample_size": size,
+        "used_k": k,
+        "seed": seed,
+        "models": models,
+        "model_pairs": model_pairs,
+        **verdict,
+        "elapsed_seconds": time.perf_counter() - started,
+    }
+
+
+def run_stability_analysis(
+    date: str,
+    signs: List[str],
+    *,
+    n_resamples: int = 2000,
+    seed: int = 42,
+    n_jobs: int | None = None,
+    analysis_path: str = "outputs/analysis_report.json",
+) -> Dict:
+    """Lee los resúmenes por fuente de data/summaries/<date> y delega en `run_stability_on_items`."""
+    return run_stability_on_items(
+        load_source_summaries(date, signs),
+        n_resamples=n_resamples,
+        seed=seed,
+        n_jobs=n_jobs,
+        analysis_path=analysis_path,
+    )
+
+
+def run_stability_on_items(
+    items: List[Tuple[str, str, str]],
+    *,
+    n_resamples: int = 2000,
+    seed: int = 42,
+    n_jobs: int | None = None,
+    analysis_path: str = "outputs/analysis_report.json",
+) -> Dict:
+    """
+    items: (sign, interpreter, final_summary) por resumen de fuente.
+    Embebe cada resumen, corre el análisis y lo agrega a analysis_report.json bajo STABILITY_KEY.
+    """
+    items = [(sign, interp, text.strip()) for sign, interp, text in items if (text or "").strip()]
+    if items:
+        embeddings_by_model = build_source_embeddings(items)
+        result = stability_analysis(
+            embeddings_by_model,
+            [sign for sign, _, _ in items],
+            [interp for _, interp, _ in items],
+            n_resamples=n_resamples,
+            seed=seed,
+            n_jobs=n_jobs,
+        )
+    else:
+        result = {"error": "no_samples", "message": "No per-source summaries available", "n_samples": 0}
+
+    report: Dict = {}
+    if os.path.exists(analysis_path):
+        with open(analysis_path, "r", encoding="utf-8") as f:
+            report = json.load(f)
+    report[STABILITY_KEY] = result
+    os.makedirs(os.path.dirname(analysis_path) or ".", exist_ok=True)
+    with open(analysis_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    return result
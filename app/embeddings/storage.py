@@ -0,0 +1,121 @@
+import json
+import os
+from dataclasses import dataclass
+from typing import List, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+
+STORAGE_FORMATS = ("float32", "float16", "int8")
+
+
+@dataclass
+class QuantizedEmbeddings:
+    # Symmetric per-dimension scalar quantization: X ~= codes * scale
+    codes: np.ndarray  # int8, (n_samples, n_features)
+    scale: np.ndarray  # float32, (n_features,)
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return self.codes.shape
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.codes.nbytes + self.scale.nbytes)
+
+    def dequantize(self) -> np.ndarray:
+        return self.codes.astype(np.float32) * self.scale[None, :]
+
+
+StoredEmbeddings = Union[np.ndarray, QuantizedEmbeddings]
+
+
+def reduce_dimensions(X: np.ndarray, dimensions: int | None) -> np.ndarray:
+    # text-embedding-3 vectors can be shortened by truncating and re-normalizing,
+    # which is what the API does server-side when `dimensions` is passed.
+    X = np.asarray(X, dtype=np.float32)
+    if not dimensions or dimensions >= X.shape[1]:
+        return X
+    Xr = X[:, :dimensions]
+    norms = np.linalg.norm(Xr, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (Xr / norms).astype(np.float32)
+
+
+def quantize_int8(X: np.ndarray) -> QuantizedEmbeddings:
+    X = np.asarray(X, dtype=np.float32)
+    max_abs = np.abs(X).max(axis=0) if X.size else np.zeros(X.shape[1], dtype=np.float32)
+    scale = (max_abs / 127.0).astype(np.float32)
+    scale[scale == 0] = 1.0
+    codes = np.clip(np.rint(X / scale[None, :]), -127, 127).astype(np.int8)
+    return QuantizedEmbeddings(codes=codes, scale=scale)
+
+
+def encode(X: np.ndarray, storage: str = "float32") -> StoredEmbeddings:
+    if storage == "float32":
+        return np.asarray(X, dtype=np.float32)
+    if storage == "float16":
+        return np.asarray(X, dtype=np.float16)
+    if storage == "int8":
+        return quantize_int8(X)
+    raise ValueError(f"Unsupported storage format: {storage} (expected one of {STORAGE_FORMATS})")
+
+
+def to_float32(X: StoredEmbeddings) -> np.ndarray:
+    if isinstance(X, QuantizedEmbeddings):
+        return X.dequantize()
+    return np.asarray(X, dtype=np.float32)
+
+
+def embeddings_path(model: str, storage: str = "float32", *, data_dir: str = "data") -> str:
+    ext = "npz" if storage == "int8" else "npy"
+    return os.path.join(data_dir, f"embeddings_{model}.{ext}")
+
+
+def save_embeddings(
+    model: str,
+    stored: StoredEmbeddings,
+    signs: List[str],
+    *,
+    data_dir: str = "data",
+    write_csv: bool = True,
+) -> str:
+    os.makedirs(data_dir, exist_ok=True)
+    if isinstance(stored, QuantizedEmbeddings):
+        storage = "int8"
+        path = embeddings_path(model, storage, data_dir=data_dir)
+        np.savez(path, codes=stored.codes, scale=stored.scale)
+    else:
+        storage = str(stored.dtype)
+        path = embeddings_path(model, storage, data_dir=data_dir)
+        np.save(path, stored)
+
+    # Sidecar so readers know how to decode the matrix and which row is which sign
+    meta = {"model": model, "storage": storage, "shape": list(stored.shape), "signs": list(signs)}
+    with open(os.path.join(data_dir, f"embeddings_{model}.meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+
+    if write_csv:
+        # CSV with sign labels; reduced precision formats are written with matching precision
+        df = pd.DataFrame(to_float32(stored))
+        df.insert(0, "sign", signs)
+        float_format = None if storage == "float32" else "%.5g"
+        df.to_csv(os.path.join(data_dir, f"embeddings_{model}.csv"), index=False, float_format=float_format)
+    return path
+
+
+def load_embeddings(model: str, *, data_dir: str = "data", storage: str | None = None) -> StoredEmbeddings:
+    if storage is None:
+        meta_path = os.path.join(data_dir, f"embeddings_{model}.meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as f:
+                storage = json.load(f).get("storage", "float32")
+        else:
+            storage = "float32"
+    path = embeddings_path(model, storage, data_dir=data_dir)
+    if storage == "int8":
+        with np.load(path) as npz:
+            return QuantizedEmbeddings(codes=npz["codes"], scale=npz["scale"])
+    return np.load(path)
+
@@ -0,0 +1,187 @@
+import argparse
+import json
+import multiprocessing as mp
+from datetime import date as dt
+
+from dotenv import load_dotenv
+
+from app.queue.coordinator import run_coordinator
+from app.queue.selfcheck import run_selfcheck
+from app.queue.work_queue import WorkQueue
+from app.queue.worker import QueueWorker
+from app.utils.signs import SIGNS
+
+
+DEFAULT_QUEUE_PATH = "data/queue.sqlite3"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Cola de trabajo multi-proceso para el agente de horóscopos")
+    parser.add_argument("--queue", type=str, default=DEFAULT_QUEUE_PATH, help="Ruta a la base SQLite de la cola")
+    parser.add_argument(
+        "--journal-mode",
+        choices=["WAL", "DELETE"],
+        default="WAL",
+        help="WAL para un solo host; DELETE si la cola vive en un filesystem compartido entre máquinas",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    enqueue = sub.add_parser("enqueue", help="Encola las unidades (sign, interpreter) de una fecha")
+    enqueue.add_argument("--date", type=str, default=str(dt.today()), help="Fecha YYYY-MM-DD")
+    enqueue.add_argument("--interpreters", nargs="+", default=["horoscope.com", "astrology.com"])
+    enqueue.add_argument("--signs", nargs="+", default=SIGNS)
+    enqueue.add_argument("--force", action="store_true", help="Borra y re-encola una fecha ya existente")
+
+    worker = sub.add_parser("worker", help="Procesa unidades de la cola")
+    worker.add_argument("--workers", type=int, default=1, help="Número de procesos worker en esta máquina")
+    worker.add_argument("--scrape-mode", choices=["auto", "browser", "requests"], default="requests")
+    worker.add_argument("--consolidate", choices=["llm", "local"], default="llm")
+    worker.add_argument("--lease-seconds", type=float, default=120)
+    worker.add_argument("--idle-exit", type=float, default=None, help="Salir tras N segundos sin trabajo")
+
+    coordinator = sub.add_parser("coordinator", help="Finaliza una fecha (embeddings + análisis) cuando termina")
+    coordinator.add_argument("--date", type=str, default=str(dt.today()), help="Fecha YYYY-MM-DD")
+    coordinator.add_argument("--report-model", type=str, default=None)
+    coordinator.add_argument("--timeout", type=float, default=None)
+    coordinator.add_argument(
+        "--stability-resamples",
+        type=int,
+        default=2000,
+        help="Remuestreos bootstrap/permutación para intérprete vs. modelo de embedding (0 = omitir)",
+    )
+
+    run = sub.add_parser("run", help="Encola, lanza N workers locales y coordina hasta terminar")
+    run.add_argument("--date", type=str, default=str(dt.today()), help="Fecha YYYY-MM-DD")
+    run.add_argument("--interpreters", nargs="+", default=["horoscope.com", "astrology.com"])
+    run.add_argument("--signs", nargs="+", default=SIGNS)
+    run.add_argument("--workers", type=int, default=4)
+    run.add_argument("--force", action="store_true", help="Borra y re-encola una fecha ya existente")
+    run.add_argument("--scrape-mode", choices=["auto", "browser", "requests"], default="requests")
+    run.add_argument("--consolidate", choices=["llm", "local"], default="llm")
+    run.add_argument("--lease-seconds", type=float, default=120)
+    run.add_argument("--report-model", type=str, default=None)
+    run.add_argument(
+        "--stability-resamples",
+        type=int,
+        default=2000,
+        help="Remuestreos bootstrap/permutación para intérprete vs. modelo de embedding (0 = omitir)",
+    )
+
+    status = sub.add_parser("status", help="Muestra el estado de una fecha")
+    status.add_argument("--date", type=str, default=str(dt.today()), help="Fecha YYYY-MM-DD")
+
+    selfcheck = sub.add_parser("selfcheck", help="Comprobación local con etapas simuladas (sin OpenAI ni red)")
+    selfcheck.add_argument("--workers", type=int, default=4, help="Procesos worker (más de 3: la prueba mata 3)")
+    selfcheck.add_argument("--coordinators", type=int, default=3, help="Coordinadores compitiendo por fecha")
+    return parser.parse_args()
+
+
+def _worker_main(
+    queue_path: str,
+    journal_mode: str,
+    scrape_mode: str,
+    consolidate_mode: str,
+    lease_seconds: float,
+    idle_exit: float | None,
+    stop_event=None,
+) -> None:
+    load_dotenv()
+    QueueWorker(
+        queue_path,
+        scrape_mode=scrape_mode,
+        consolidate_mode=consolidate_mode,
+        lease_seconds=lease_seconds,
+        journal_mode=journal_mode,
+    ).run(idle_exit=idle_exit, stop_event=stop_event)
+
+
+def _spawn_workers(args: argparse.Namespace, n: int, idle_exit: float | None, stop_event=None) -> list:
+    ctx = mp.get_context("spawn")
+    procs = []
+    for _ in range(max(1, n)):
+        p = ctx.Process(
+            target=_worker_main,
+            args=(
+                args.queue,
+                args.journal_mode,
+                args.scrape_mode,
+                args.consolidate,
+                args.lease_seconds,
+                idle_exit,
+                stop_event,
+            ),
+        )
+        p.start()
+        procs.append(p)
+    return procs
+
+
+def _enqueue(queue: WorkQueue, args: argparse.Namespace) -> int:
+    try:
+        return queue.enqueue_date(args.date, args.signs, args.interpreters, force=args.force)
+    except ValueError as e:
+        raise SystemExit(f"[QUEUE ❌] {e}")
+    finally:
+        queue.close()
+
+
+def main() -> None:
+    args = parse_args()
+    load_dotenv()
+
+    if args.command == "enqueue":
+        queue = WorkQueue(args.queue, journal_mode=args.journal_mode)
+        added = _enqueue(queue, args)
+        print(f"[QUEUE] {added} unidades encoladas para {args.date} en {args.queue}")
+
+    elif args.command == "worker":
+        procs = _spawn_workers(args, args.workers, args.idle_exit)
+        for p in procs:
+            p.join()
+
+    elif args.command == "coordinator":
+        result = run_coordinator(
+            args.queue,
+            args.date,
+            timeout=args.timeout,
+            report_model=args.report_model,
+            journal_mode=args.journal_mode,
+            n_resamples=args.stability_resamples,
+        )
+        print(json.dumps(result, ensure_ascii=False))
+
+    elif args.command == "run":
+        queue = WorkQueue(args.queue, journal_mode=args.journal_mode)
+        added = _enqueue(queue, args)
+        print(f"[QUEUE] {added} unidades encoladas para {args.date}; lanzando {args.workers} workers")
+        # Workers stay up until the date is finalized, so units whose lease expires (dead worker,
+        # slow scrape) are always re-claimed; the coordinator aborts if every worker has died.
+        stop = mp.get_context("spawn").Event()
+        procs = _spawn_workers(args, args.workers, idle_exit=None, stop_event=stop)
+        try:
+            run_coordinator(
+                args.queue,
+                args.date,
+                report_model=args.report_model,
+                journal_mode=args.journal_mode,
+                workers_alive=lambda: any(p.is_alive() for p in procs),
+                n_resamples=args.stability_resamples,
+            )
+        finally:
+            stop.set()
+            for p in procs:
+                p.join()
+
+    elif args.command == "status":
+        queue = WorkQueue(args.queue, journal_mode=args.journal_mode)
+        info = queue.date_info(args.date)
+        counts = queue.status_counts(args.date)
+        queue.close()
+        print(json.dumps({"date": info, "units": counts}, ensure_ascii=False, indent=2))
+
+    elif args.command == "selfcheck":
+        run_selfcheck(args.workers, args.coordinators)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import os
+import socket
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.queue.work_queue import WorkQueue
+
+
+def finalize_date(
+    date: str,
+    final_per_sign: Dict[str, Dict],
+    signs: list[str],
+    *,
+    source_items: List[Tuple[str, str, str]],
+    report_model: Optional[str] = None,
+    n_resamples: int = 2000,
+) -> Dict:
+    # Same tail as main.py: embeddings -> PCA/KMeans -> stability -> Markdown report.
+    # Imported here so coordinator processes only pay for sklearn/matplotlib when they finalize.
+    from app.analysis.report_agent import generate_final_report
+    from app.embeddings.analyze import analyze_embeddings
+    from app.embeddings.build_embeddings import build_embeddings
+    from app.embeddings.stability import run_stability_on_items
+
+    sign_to_text = {sign: (final_per_sign.get(sign, {}).get("final_summary") or "") for sign in signs}
+    embeddings_by_model = build_embeddings(sign_to_text)
+    analyze_embeddings(embeddings_by_model, signs=signs)
+    if n_resamples > 0:
+        run_stability_on_items(source_items, n_resamples=n_resamples)
+
+    analysis_path = "outputs/analysis_report.json"
+    report_path = f"outputs/final_analysis_{date}.md"
+    out_md = generate_final_report(date, analysis_path, report_path, model=report_model)
+    return {"analysis_path": analysis_path, "report_path": out_md}
+
+
+def run_coordinator(
+    queue_path: str,
+    date: str,
+    *,
+    poll_interval: float = 2.0,
+    timeout: Optional[float] = None,
+    report_model: Optional[str] = None,
+    journal_mode: str = "WAL",
+    finalize: Callable[..., Dict] = finalize_date,
+    workers_alive: Optional[Callable[[], bool]] = None,
+    n_resamples: int = 2000,
+) -> Optional[Dict]:
+    """
+    Espera a que todas las unidades de `date` terminen y dispara `finalize` (embeddings + análisis) una sola vez.
+    Todo sale de la cola (no de data/summaries local), así que el coordinador puede correr en otra máquina.
+    workers_alive: si se pasa y devuelve False antes de terminar, se aborta en vez de esperar para siempre.
+    n_resamples: remuestreos del análisis intérprete vs. modelo (0 = omitir).
+    """
+    owner = f"coordinator-{socket.gethostname()}-{os.getpid()}"
+    queue = WorkQueue(queue_path, journal_mode=journal_mode)
+    started = time.monotonic()
+    try:
+        while True:
+            info = queue.date_info(date)
+            if info is None:
+                raise RuntimeError(f"Date not enqueued: {date}")
+            if info["status"] == "finalized":
+                return info["result"]
+            if queue.claim_finalize(date, owner):
+                print(f"[COORDINATOR] {date} completo: generando embeddings y análisis")
+                final_per_sign = {}
+                source_items: List[Tuple[str, str, str]] = []
+                for sign in info["signs"]:
+                    consolidated = queue.results(date, sign, "consolidate")
+                    final_per_sign[sign] = consolidated[0] if consolidated else {}
+                    for s in queue.results(date, sign, "summarize"):
+                        source_items.append((sign, s.get("interpreter") or "", s.get("final_summary") or ""))
+                try:
+                    result = finalize(
+                        date,
+                        final_per_sign,
+                        info["signs"],
+                        source_items=source_items,
+                        report_model=report_model,
+                        n_resamples=n_resamples,
+                    )
+                except Exception:
+                    queue.release_finalize(date, owner)
+                    raise
+                queue.mark_finalized(date, owner, result)
+                print(f"[COORDINATOR] {date} finalizado: {result}")
+                return result
+            if timeout is not None and time.monotonic() - started >= timeout:
+                return None
+            if workers_alive is not None and not workers_alive():
+                raise RuntimeError(f"All workers exited before {date} was finalized: {queue.status_counts(date)}")
+            time.sleep(poll_interval)
+    finally:
+        queue.close()
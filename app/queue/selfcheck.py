@@ -0,0 +1,166 @@
+import multiprocessing as mp
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from typing import Dict, List
+
+from app.queue.coordinator import run_coordinator
+from app.queue.work_queue import WorkQueue, WorkUnit
+from app.queue.worker import QueueWorker
+from app.utils.signs import SIGNS
+
+
+# Local check of the queue with stubbed stages (no OpenAI key or network): N spawned workers and
+# several competing coordinators over a temp SQLite file. Special scrape units exercise failure modes
+# (the crashing ones only on the first date, so the number of killed workers is fixed):
+DATES = ["2000-01-01", "2000-01-02"]
+INTERPRETERS = ["a", "b"]
+CRASH_ONCE = ("aries", "b")  # worker process dies holding the lease on attempt 1 -> re-claimed after expiry
+ALWAYS_CRASH = ("leo", "b")  # dies on every attempt -> marked failed ('lease expired') at the retry budget
+FLAKY = ("virgo", "a")  # raises on every attempt -> marked failed through fail() at the retry budget
+EMPTY = ("pisces", "b")  # scrape returns no text -> no summarize unit for it
+MAX_ATTEMPTS = 2
+LEASE_SECONDS = 2.0
+
+
+class _StubWorker(QueueWorker):
+    def process(self, unit: WorkUnit) -> Dict:
+        time.sleep(random.uniform(0.0, 0.05))
+        key = (unit.sign, unit.interpreter)
+        if unit.stage == "scrape":
+            crash_date = unit.date == DATES[0]
+            if crash_date and (key == ALWAYS_CRASH or (key == CRASH_ONCE and unit.attempts == 1)):
+                os._exit(1)
+            if key == FLAKY:
+                raise RuntimeError("flaky scrape")
+            text = "" if key == EMPTY else f"{unit.sign} via {unit.interpreter}"
+            return {"sign": unit.sign, "interpreter": unit.interpreter, "raw_text": text}
+        if unit.stage == "summarize":
+            return {"final_summary": f"{unit.sign} summary from {unit.interpreter}"}
+        summaries = self.queue.results(unit.date, unit.sign, "summarize")
+        return {"final_summary": " ".join(s["final_summary"] for s in summaries)}
+
+
+def _worker_main(queue_path: str, log_dir: str, stop_event) -> None:
+    _StubWorker(
+        queue_path,
+        lease_seconds=LEASE_SECONDS,
+        poll_interval=0.05,
+        max_attempts=MAX_ATTEMPTS,
+        log_dir=log_dir,
+    ).run(stop_event=stop_event)
+
+
+def _stub_finalize(
+    date: str, final_per_sign: Dict[str, Dict], signs: List[str], *, source_items, report_model=None, n_resamples=0
+) -> Dict:
+    marker = os.environ["QUEUE_SELFCHECK_MARKER"]
+    time.sleep(0.2)  # widen the window for a second coordinator to race
+    with open(marker, "a", encoding="utf-8") as f:
+        f.write(f"{date} {os.getpid()} {len(source_items)}\n")
+    return {"signs": len(final_per_sign)}
+
+
+def _coordinator_main(queue_path: str, date: str, marker: str) -> None:
+    os.environ["QUEUE_SELFCHECK_MARKER"] = marker
+    if run_coordinator(queue_path, date, poll_interval=0.1, timeout=60, finalize=_stub_finalize) is None:
+        raise SystemExit(2)
+
+
+def run_selfcheck(n_workers: int = 4, n_coordinators: int = 3) -> None:
+    """Lanza la comprobación y levanta AssertionError si algún invariante de la cola no se cumple."""
+    deaths = 1 + MAX_ATTEMPTS  # CRASH_ONCE once, ALWAYS_CRASH on every attempt
+    if n_workers <= deaths:
+        raise ValueError(f"Need more than {deaths} workers: the check kills {deaths} worker processes")
+
+    ctx = mp.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        queue_path = os.path.join(tmp, "queue.sqlite3")
+        marker = os.path.join(tmp, "finalized.log")
+        queue = WorkQueue(queue_path, max_attempts=MAX_ATTEMPTS)
+        for date in DATES:
+            queue.enqueue_date(date, SIGNS, INTERPRETERS)
+
+        started = time.monotonic()
+        stop = ctx.Event()
+        workers = [ctx.Process(target=_worker_main, args=(queue_path, tmp, stop)) for _ in range(n_workers)]
+        coordinators = [
+            ctx.Process(target=_coordinator_main, args=(queue_path, date, marker))
+            for date in DATES
+            for _ in range(n_coordinators)
+        ]
+        for p in workers + coordinators:
+            p.start()
+        for p in coordinators:
+            p.join(timeout=90)
+        stop.set()
+        for p in workers:
+            p.join(timeout=30)
+        elapsed = time.monotonic() - started
+
+        assert all(p.exitcode == 0 for p in coordinators), [p.exitcode for p in coordinators]
+        crashed = sum(1 for p in workers if p.exitcode == 1)
+        assert crashed == deaths, f"expected {deaths} crashed workers, got {crashed}"
+
+        conn = sqlite3.connect(queue_path)
+        conn.row_factory = sqlite3.Row
+
+        def unit(date: str, sign: str, interp: str, stage: str) -> sqlite3.Row:
+            return conn.execute(
+                "SELECT * FROM units WHERE date = ? AND sign = ? AND interpreter = ? AND stage = ?",
+                (date, sign, interp, stage),
+            ).fetchone()
+
+        summarized = {
+            date: conn.execute(
+                "SELECT COUNT(*) FROM units WHERE date = ? AND stage = 'summarize' AND status = 'done'", (date,)
+            ).fetchone()[0]
+            for date in DATES
+        }
+        open_units = conn.execute("SELECT COUNT(*) FROM units WHERE status IN ('pending', 'leased')").fetchone()[0]
+        assert open_units == 0, f"{open_units} units left open"
+        row = unit(DATES[0], *CRASH_ONCE, "scrape")
+        assert row["status"] == "done" and row["attempts"] == 2, dict(row)
+        row = unit(DATES[0], *ALWAYS_CRASH, "scrape")
+        assert row["status"] == "failed" and row["error"] == "lease expired", dict(row)
+        assert row["attempts"] == MAX_ATTEMPTS, dict(row)
+        for date in DATES:
+            row = unit(date, *FLAKY, "scrape")
+            assert row["status"] == "failed" and row["attempts"] == MAX_ATTEMPTS, dict(row)
+            assert row["error"].startswith("RuntimeError"), dict(row)
+            assert unit(date, *EMPTY, "summarize") is None
+            assert unit(date, *FLAKY, "summarize") is None
+            for sign in SIGNS:
+                row = unit(date, sign, "", "consolidate")
+                assert row is not None and row["status"] == "done", (date, sign)
+            assert queue.date_info(date)["status"] == "finalized"
+        conn.close()
+        queue.close()
+
+        # Re-enqueueing a finalized date must not silently return the old result
+        queue = WorkQueue(queue_path, max_attempts=MAX_ATTEMPTS)
+        try:
+            queue.enqueue_date(DATES[0], SIGNS, INTERPRETERS)
+            raise AssertionError("re-enqueueing a finalized date did not raise")
+        except ValueError:
+            pass
+        added = queue.enqueue_date(DATES[0], SIGNS[:2], INTERPRETERS, force=True)
+        assert added == 2 * len(INTERPRETERS), added
+        info = queue.date_info(DATES[0])
+        assert info["status"] == "open" and info["signs"] == SIGNS[:2], info
+        queue.close()
+
+        with open(marker, "r", encoding="utf-8") as f:
+            lines = [line.split() for line in f if line.strip()]
+        finalized = [line[0] for line in lines]
+        assert sorted(finalized) == sorted(DATES), f"each date must be finalized exactly once: {finalized}"
+        # Per-source summaries for the stability analysis come from the queue, one per done summarize unit
+        for date, _, n_items in lines:
+            assert int(n_items) == summarized[date], (date, n_items, summarized[date])
+
+    print(
+        f"[SELFCHECK ✅] {n_workers} workers, {n_coordinators} coordinadores por fecha, {len(DATES)} fechas: "
+        f"leases vencidos re-asignados, presupuesto de reintentos respetado, una finalización por fecha ({elapsed:.1f}s)"
+    )
@@ -0,0 +1,320 @@
+import json
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+
+# Pipeline per (date, sign): scrape (per interpreter) -> summarize (per interpreter) -> consolidate (per sign).
+# Once every sign of a date is consolidated, a coordinator finalizes the date (embeddings + analysis).
+STAGES = ("scrape", "summarize", "consolidate")
+CONSOLIDATE_INTERPRETER = ""
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS units (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date TEXT NOT NULL,
+    sign TEXT NOT NULL,
+    interpreter TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    result TEXT,
+    error TEXT,
+    updated_at REAL,
+    UNIQUE (date, sign, interpreter, stage)
+);
+CREATE INDEX IF NOT EXISTS idx_units_status ON units (status, lease_expires);
+CREATE INDEX IF NOT EXISTS idx_units_date_sign ON units (date, sign, stage);
+CREATE TABLE IF NOT EXISTS dates (
+    date TEXT PRIMARY KEY,
+    signs TEXT NOT NULL,
+    interpreters TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'open',
+    lease_owner TEXT,
+    lease_expires REAL,
+    result TEXT,
+    updated_at REAL
+);
+"""
+
+
+@dataclass
+class WorkUnit:
+    id: int
+    date: str
+    sign: str
+    interpreter: str
+    stage: str
+    attempts: int
+
+
+class WorkQueue:
+    """
+    Cola de trabajo durable sobre SQLite con leases y heartbeats.
+    Cada proceso (worker o coordinador) abre su propia instancia sobre el mismo archivo.
+    journal_mode: 'WAL' para un solo host; 'DELETE' si la base vive en un filesystem compartido.
+    """
+
+    def __init__(self, path: str, *, journal_mode: str = "WAL", max_attempts: int = 3) -> None:
+        self.path = path
+        self.max_attempts = max(1, int(max_attempts))
+        Path(os.path.dirname(os.path.abspath(path))).mkdir(parents=True, exist_ok=True)
+        # isolation_level=None: transactions are managed explicitly with BEGIN IMMEDIATE
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute(f"PRAGMA journal_mode={journal_mode}")
+        self.conn.execute("PRAGMA busy_timeout=30000")
+        self.conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def _begin(self) -> None:
+        self.conn.execute("BEGIN IMMEDIATE")
+
+    def _commit(self) -> None:
+        self.conn.execute("COMMIT")
+
+    def _rollback(self) -> None:
+        self.conn.execute("ROLLBACK")
+
+    def _insert_unit(self, date: str, sign: str, interpreter: str, stage: str) -> None:
+        self.conn.execute(
+            "INSERT OR IGNORE INTO units (date, sign, interpreter, stage, updated_at) VALUES (?, ?, ?, ?, ?)",
+            (date, sign, interpreter, stage, time.time()),
+        )
+
+    def enqueue_date(self, date: str, signs: Iterable[str], interpreters: Iterable[str], *, force: bool = False) -> int:
+        """
+        Encola las unidades scrape de `date`. Si la fecha ya existe, solo se reanuda cuando está abierta con los
+        mismos signos e intérpretes; si ya se finalizó o el conjunto cambia, levanta ValueError salvo con `force`,
+        que borra sus unidades y la vuelve a abrir.
+        """
+        signs = list(signs)
+        interpreters = list(interpreters)
+        self._begin()
+        try:
+            row = self.conn.execute("SELECT * FROM dates WHERE date = ?", (date,)).fetchone()
+            if row is not None and force:
+                self.conn.execute("DELETE FROM units WHERE date = ?", (date,))
+                self.conn.execute("DELETE FROM dates WHERE date = ?", (date,))
+            elif row is not None:
+                if row["status"] == "finalized":
+                    raise ValueError(f"Date {date} is already finalized; pass force=True (--force) to reset it and run it again")
+                if json.loads(row["signs"]) != signs or json.loads(row["interpreters"]) != interpreters:
+                    raise ValueError(
+                        f"Date {date} is already enqueued with signs={json.loads(row['signs'])} "
+                        f"interpreters={json.loads(row['interpreters'])}; pass force=True (--force) to reset it"
+                    )
+            self.conn.execute(
+                "INSERT OR IGNORE INTO dates (date, signs, interpreters, updated_at) VALUES (?, ?, ?, ?)",
+                (date, json.dumps(signs), json.dumps(interpreters), time.time()),
+            )
+            before = self.conn.total_changes
+            for sign in signs:
+                for interp in interpreters:
+                    self._insert_unit(date, sign, interp, "scrape")
+            added = self.conn.total_changes - before
+            self._commit()
+        except Exception:
+            self._rollback()
+            raise
+        return added
+
+    def claim(self, worker_id: str, *, lease_seconds: float = 120) -> Optional[WorkUnit]:
+        now = time.time()
+        self._begin()
+        try:
+            # Expired leases past the retry budget are given up on (and may unblock consolidation)
+            exhausted = self.conn.execute(
+                "SELECT * FROM units WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (now, self.max_attempts),
+            ).fetchall()
+            for row in exhausted:
+                self.conn.execute(
+                    "UPDATE units SET status = 'failed', error = 'lease expired', lease_owner = NULL, updated_at = ? WHERE id = ?",
+                    (now, row["id"]),
+                )
+                self._advance(row)
+
+            row = self.conn.execute(
+                "SELECT * FROM units WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ?) "
+                "ORDER BY id LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                self._commit()
+                return None
+            self.conn.execute(
+                "UPDATE units SET status = 'leased', lease_owner = ?, lease_expires = ?, attempts = attempts + 1, "
+                "updated_at = ? WHERE id = ?",
+                (worker_id, now + lease_seconds, now, row["id"]),
+            )
+            self._commit()
+        except Exception:
+            self._rollback()
+            raise
+        return WorkUnit(
+            id=row["id"],
+            date=row["date"],
+            sign=row["sign"],
+            interpreter=row["interpreter"],
+            stage=row["stage"],
+            attempts=row["attempts"] + 1,
+        )
+
+    def heartbeat(self, unit_id: int, worker_id: str, *, lease_seconds: float = 120) -> bool:
+        now = time.time()
+        cur = self.conn.execute(
+            "UPDATE units SET lease_expires = ?, updated_at = ? WHERE id = ? AND lease_owner = ? AND status = 'leased'",
+            (now + lease_seconds, now, unit_id, worker_id),
+        )
+        return cur.rowcount > 0
+
+    def complete(self, unit: WorkUnit, worker_id: str, result: Dict[str, Any]) -> bool:
+        """Marca la unidad como terminada y encola la siguiente etapa. False si el lease se perdió."""
+        self._begin()
+        try:
+            cur = self.conn.execute(
+                "UPDATE units SET status = 'done', result = ?, error = NULL, lease_owner = NULL, updated_at = ? "
+                "WHERE id = ? AND lease_owner = ? AND status = 'leased'",
+                (json.dumps(result, ensure_ascii=False), time.time(), unit.id, worker_id),
+            )
+            if cur.rowcount == 0:
+                self._rollback()
+                return False
+            row = self.conn.execute("SELECT * FROM units WHERE id = ?", (unit.id,)).fetchone()
+            self._advance(row)
+            self._commit()
+        except Exception:
+            self._rollback()
+            raise
+        return True
+
+    def fail(self, unit: WorkUnit, worker_id: str, error: str) -> bool:
+        now = time.time()
+        self._begin()
+        try:
+            row = self.conn.execute(
+                "SELECT * FROM units WHERE id = ? AND lease_owner = ? AND status = 'leased'",
+                (unit.id, worker_id),
+            ).fetchone()
+            if row is None:
+                self._rollback()
+                return False
+            status = "pending" if row["attempts"] < self.max_attempts else "failed"
+            self.conn.execute(
+                "UPDATE units SET status = ?, error = ?, lease_owner = NULL, updated_at = ? WHERE id = ?",
+                (status, error, now, unit.id),
+            )
+            if status == "failed":
+                self._advance(row)
+            self._commit()
+        except Exception:
+            self._rollback()
+            raise
+        return True
+
+    def _advance(self, row: sqlite3.Row) -> None:
+        # Called inside an open transaction once a unit reaches a terminal state
+        date, sign, stage = row["date"], row["sign"], row["stage"]
+        if stage == "scrape" and row["status"] == "done":
+            result = json.loads(row["result"] or "{}")
+            if result.get("raw_text"):
+                self._insert_unit(date, sign, row["interpreter"], "summarize")
+        if stage in ("scrape", "summarize"):
+            open_units = self.conn.execute(
+                "SELECT COUNT(*) FROM units WHERE date = ? AND sign = ? AND stage IN ('scrape', 'summarize') "
+                "AND status IN ('pending', 'leased')",
+                (date, sign),
+            ).fetchone()[0]
+            if open_units == 0:
+                self._insert_unit(date, sign, CONSOLIDATE_INTERPRETER, "consolidate")
+
+    def results(self, date: str, sign: str, stage: str) -> List[Dict[str, Any]]:
+        rows = self.conn.execute(
+            "SELECT result FROM units WHERE date = ? AND sign = ? AND stage = ? AND status = 'done' ORDER BY id",
+            (date, sign, stage),
+        ).fetchall()
+        return [json.loads(r["result"]) for r in rows if r["result"]]
+
+    def result(self, date: str, sign: str, interpreter: str, stage: str) -> Optional[Dict[str, Any]]:
+        row = self.conn.execute(
+            "SELECT result FROM units WHERE date = ? AND sign = ? AND interpreter = ? AND stage = ? AND status = 'done'",
+            (date, sign, interpreter, stage),
+        ).fetchone()
+        return json.loads(row["result"]) if row and row["result"] else None
+
+    def date_info(self, date: str) -> Optional[Dict[str, Any]]:
+        row = self.conn.execute("SELECT * FROM dates WHERE date = ?", (date,)).fetchone()
+        if row is None:
+            return None
+        return {
+            "date": row["date"],
+            "signs": json.loads(row["signs"]),
+            "interpreters": json.loads(row["interpreters"]),
+            "status": row["status"],
+            "result": json.loads(row["result"]) if row["result"] else None,
+        }
+
+    def status_counts(self, date: str) -> Dict[str, Dict[str, int]]:
+        rows = self.conn.execute(
+            "SELECT stage, status, COUNT(*) AS n FROM units WHERE date = ? GROUP BY stage, status",
+            (date,),
+        ).fetchall()
+        counts: Dict[str, Dict[str, int]] = {}
+        for r in rows:
+            counts.setdefault(r["stage"], {})[r["status"]] = r["n"]
+        return counts
+
+    def is_date_complete(self, date: str) -> bool:
+        info = self.date_info(date)
+        if info is None:
+            return False
+        open_units = self.conn.execute(
+            "SELECT COUNT(*) FROM units WHERE date = ? AND status IN ('pending', 'leased')",
+            (date,),
+        ).fetchone()[0]
+        consolidated = self.conn.execute(
+            "SELECT COUNT(DISTINCT sign) FROM units WHERE date = ? AND stage = 'consolidate' AND status IN ('done', 'failed')",
+            (date,),
+        ).fetchone()[0]
+        return open_units == 0 and consolidated >= len(info["signs"])
+
+    def claim_finalize(self, date: str, owner: str, *, lease_seconds: float = 600) -> bool:
+        """Solo un coordinador finaliza cada fecha; un lease vencido permite reintentar."""
+        now = time.time()
+        self._begin()
+        try:
+            if not self.is_date_complete(date):
+                self._commit()
+                return False
+            cur = self.conn.execute(
+                "UPDATE dates SET status = 'finalizing', lease_owner = ?, lease_expires = ?, updated_at = ? "
+                "WHERE date = ? AND (status = 'open' OR (status = 'finalizing' AND lease_expires < ?))",
+                (owner, now + lease_seconds, now, date, now),
+            )
+            self._commit()
+        except Exception:
+            self._rollback()
+            raise
+        return cur.rowcount > 0
+
+    def mark_finalized(self, date: str, owner: str, result: Dict[str, Any]) -> bool:
+        cur = self.conn.execute(
+            "UPDATE dates SET status = 'finalized', result = ?, lease_owner = NULL, updated_at = ? "
+            "WHERE date = ? AND lease_owner = ? AND status = 'finalizing'",
+            (json.dumps(result, ensure_ascii=False), time.time(), date, owner),
+        )
+        return cur.rowcount > 0
+
+    def release_finalize(self, date: str, owner: str) -> None:
+        self.conn.execute(
+            "UPDATE dates SET status = 'open', lease_owner = NULL, updated_at = ? WHERE date = ? AND lease_owner = ?",
+            (time.time(), date, owner),
+        )
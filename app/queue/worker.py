@@ -0,0 +1,143 @@
+import asyncio
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from app.queue.work_queue import WorkQueue, WorkUnit
+from app.react_agent import HoroscopeReactAgent
+
+
+def _default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+class _Heartbeat:
+    # Renews the lease from a side thread (own SQLite connection) while the unit is being processed
+    def __init__(self, queue_path: str, unit_id: int, worker_id: str, *, lease_seconds: float, journal_mode: str) -> None:
+        self.queue_path = queue_path
+        self.unit_id = unit_id
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.journal_mode = journal_mode
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        queue = WorkQueue(self.queue_path, journal_mode=self.journal_mode)
+        try:
+            while not self._stop.wait(self.lease_seconds / 3):
+                if not queue.heartbeat(self.unit_id, self.worker_id, lease_seconds=self.lease_seconds):
+                    break
+        finally:
+            queue.close()
+
+    def __enter__(self) -> "_Heartbeat":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+class QueueWorker:
+    def __init__(
+        self,
+        queue_path: str,
+        *,
+        worker_id: Optional[str] = None,
+        scrape_mode: str = "requests",
+        consolidate_mode: str = "llm",
+        lease_seconds: float = 120,
+        poll_interval: float = 1.0,
+        journal_mode: str = "WAL",
+        max_attempts: int = 3,
+        log_dir: str = "data/logs",
+    ) -> None:
+        self.queue_path = queue_path
+        self.worker_id = worker_id or _default_worker_id()
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.journal_mode = journal_mode
+        self.queue = WorkQueue(queue_path, journal_mode=journal_mode, max_attempts=max_attempts)
+        stamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+        log_path = os.path.join(log_dir, f"worker_{self.worker_id}_{stamp}.jsonl")
+        self.agent = HoroscopeReactAgent(
+            log_path, max_concurrency=1, scrape_mode=scrape_mode, consolidate_mode=consolidate_mode
+        )
+
+    def process(self, unit: WorkUnit) -> Dict:
+        if unit.stage == "scrape":
+            return asyncio.run(self.agent._scrape_with_timeout(unit.sign, unit.date, unit.interpreter))
+
+        if unit.stage == "summarize":
+            item = self.queue.result(unit.date, unit.sign, unit.interpreter, "scrape") or {}
+            s = self.agent._summarize_one(item.get("raw_text", ""), unit.sign, unit.interpreter)
+            s["source_url"] = item.get("source_url")
+            s["interpreter"] = item.get("interpreter")
+            return s
+
+        if unit.stage == "consolidate":
+            summaries = self.queue.results(unit.date, unit.sign, "summarize")
+            # Sources whose summarize unit failed are left out so `sources` and `summaries` stay aligned
+            summarized = {s.get("interpreter") for s in summaries}
+            items = [
+                r
+                for r in self.queue.results(unit.date, unit.sign, "scrape")
+                if r.get("raw_text") and r.get("interpreter") in summarized
+            ]
+            out_dir = Path("data/summaries") / unit.date
+            return self.agent._consolidate_sign(unit.sign, unit.date, items, summaries, out_dir)
+
+        raise ValueError(f"Unknown stage: {unit.stage}")
+
+    def run_once(self) -> bool:
+        unit = self.queue.claim(self.worker_id, lease_seconds=self.lease_seconds)
+        if unit is None:
+            return False
+        print(f"[WORKER {self.worker_id}] {unit.stage} {unit.sign} @ {unit.interpreter or '-'} ({unit.date}, intento {unit.attempts})")
+        try:
+            with _Heartbeat(
+                self.queue_path,
+                unit.id,
+                self.worker_id,
+                lease_seconds=self.lease_seconds,
+                journal_mode=self.journal_mode,
+            ):
+                result = self.process(unit)
+        except Exception as e:
+            self.queue.fail(unit, self.worker_id, f"{type(e).__name__}: {e}")
+            print(f"[WORKER ❌] {unit.stage} {unit.sign} @ {unit.interpreter or '-'} -> {e}")
+            return True
+        if not self.queue.complete(unit, self.worker_id, result):
+            print(f"[WORKER ⚠️] Lease perdido para {unit.stage} {unit.sign} @ {unit.interpreter or '-'}")
+        return True
+
+    def run(self, *, idle_exit: Optional[float] = None, stop_event: Optional[Any] = None) -> int:
+        """
+        Procesa unidades hasta que se active `stop_event` (threading/multiprocessing Event) o la cola
+        esté vacía por `idle_exit` segundos. Sin ninguno de los dos, corre para siempre.
+        """
+        processed = 0
+        idle_since = time.monotonic()
+        try:
+            while stop_event is None or not stop_event.is_set():
+                if self.run_once():
+                    processed += 1
+                    idle_since = time.monotonic()
+                    continue
+                if idle_exit is not None and time.monotonic() - idle_since >= idle_exit:
+                    break
+                if stop_event is not None:
+                    stop_event.wait(self.poll_interval)
+                else:
+                    time.sleep(self.poll_interval)
+        finally:
+            self.queue.close()
+        print(f"[WORKER {self.worker_id}] {processed} unidades procesadas")
+        return processed
@@ -5,6 +5,9 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Tuple
 
+from app.embeddings.build_embeddings import embed_texts
+from app.tools.agreement import DEFAULT_AGREEMENT_THRESHOLD, source_agreement
+from app.tools.consolidate import consolidate_local
 from app.tools.scrape import scrape
 from app.tools.summarize import summarize
 from app.utils.logger import ReactLogger
@@ -12,20 +15,35 @@ from app.utils.signs import SIGNS
 
 
 class HoroscopeReactAgent:
-    def __init__(self, log_path: str, *, max_concurrency: int = 2, scrape_mode: str = "requests") -> None:
+    def __init__(
+        self,
+        log_path: str,
+        *,
+        max_concurrency: int = 2,
+        scrape_mode: str = "requests",
+        consolidate_mode: str = "llm",
+        agreement_threshold: float = DEFAULT_AGREEMENT_THRESHOLD,
+        scrape_max_bytes: int | None = None,
+    ) -> None:
         self.logger = ReactLogger(log_path, echo_to_stdout=True)
         self.max_concurrency = max(1, int(max_concurrency))
         self.scrape_mode = scrape_mode  # 'auto' | 'browser' | 'requests'
+        self.consolidate_mode = consolidate_mode  # 'llm' | 'local'
+        self.agreement_threshold = agreement_threshold
+        self.scrape_max_bytes = scrape_max_bytes  # None = SCRAPE_MAX_BYTES / 2 MiB
 
     async def _scrape_one(self, sign: str, date: str, interpreter: str) -> Dict:
         print(f"[SCRAPE] {sign} @ {interpreter}...")
         thought = f"Necesito obtener el horóscopo de {sign} en {interpreter} para {date}."
         self.logger.log(thought=thought, action="scrape", metadata={"sign": sign, "interpreter": interpreter, "date": date})
-        result = await scrape(sign, date, interpreter, mode=self.scrape_mode)
-        obs = f"Longitud del texto: {len(result.get('raw_text',''))}. Error: {result.get('error')}"
-        self.logger.log(observation=obs, metadata={"sign": sign, "interpreter": interpreter})
+        result = await scrape(sign, date, interpreter, mode=self.scrape_mode, max_bytes=self.scrape_max_bytes)
+        obs = f"Longitud del texto: {len(result.get('raw_text',''))}. Bytes: {result.get('bytes', 0)}. Error: {result.get('error')}"
+        self.logger.log(
+            observation=obs,
+            metadata={"sign": sign, "interpreter": interpreter, "bytes": result.get("bytes", 0), "truncated": result.get("truncated", False)},
+        )
         if result.get("raw_text"):
-            print(f"[SCRAPE ✅] {sign} @ {interpreter} ({len(result['raw_text'])} chars)")
+            print(f"[SCRAPE ✅] {sign} @ {interpreter} ({len(result['raw_text'])} chars, {result.get('bytes', 0)} bytes)")
         else:
             print(f"[SCRAPE ❌] {sign} @ {interpreter} -> {result.get('error')}")
         return result
@@ -40,7 +58,76 @@ class HoroscopeReactAgent:
         print(f"[SUMMARIZE ✅] {sign} from {source}")
         return summary
 
+    async def _scrape_with_timeout(self, sign: str, date: str, interpreter: str, *, timeout: float = 45) -> Dict:
+        try:
+            return await asyncio.wait_for(self._scrape_one(sign, date, interpreter), timeout=timeout)
+        except asyncio.TimeoutError:
+            self.logger.log(observation=f"Scrape timeout", metadata={"sign": sign, "interpreter": interpreter})
+            print(f"[SCRAPE ⏱️] {sign} @ {interpreter} -> Timeout")
+            return {
+                "sign": sign,
+                "date": date,
+                "interpreter": interpreter,
+                "source_url": None,
+                "raw_text": "",
+                "error": "Timeout",
+            }
+
+    def _consolidate_local_one(self, summaries: List[Dict], sign: str) -> Dict | None:
+        # Returns None when sources disagree too much for extractive consolidation
+        agreement = source_agreement(summaries)
+        if agreement < self.agreement_threshold:
+            self.logger.log(
+                observation=f"Fuentes en desacuerdo (similitud {agreement:.2f}); se consolida con LLM",
+                metadata={"sign": sign, "agreement": agreement},
+            )
+            return None
+        print(f"[CONSOLIDATE] {sign} local (similitud {agreement:.2f})")
+        thought = f"Las fuentes para {sign} coinciden; consolido localmente sin LLM."
+        self.logger.log(thought=thought, action="consolidate_local", metadata={"sign": sign, "agreement": agreement})
+        consolidated = consolidate_local(summaries, embed=embed_texts)
+        self.logger.log(observation="Consolidación local OK", metadata={"sign": sign})
+        return consolidated
+
+    def _consolidate_sign(self, sign: str, date: str, items: List[Dict], summaries: List[Dict], out_dir: Path) -> Dict:
+        return self._consolidate_artifact(sign, date, items, summaries, out_dir)["final"]
+
+    def _consolidate_artifact(self, sign: str, date: str, items: List[Dict], summaries: List[Dict], out_dir: Path) -> Dict:
+        combined_text = "\n\n".join([x.get("final_summary", "") for x in summaries if x.get("final_summary")])
+        consolidated = None
+        if combined_text and self.consolidate_mode == "local":
+            consolidated = self._consolidate_local_one(summaries, sign)
+        if consolidated is None and combined_text:
+            consolidated = self._summarize_one(combined_text, sign, "consolidated")
+        elif consolidated is None:
+            consolidated = {"tone": "", "facets": {"love": "", "career": "", "health": ""}, "key_points": [], "final_summary": ""}
+
+        artifact = {
+            "sign": sign,
+            "date": date,
+            "sources": [
+                {
+                    "interpreter": i.get("interpreter"),
+                    "source_url": i.get("source_url"),
+                }
+                for i in items
+            ],
+            "summaries": summaries,
+            "final": consolidated,
+        }
+
+        out_dir.mkdir(parents=True, exist_ok=True)
+        with open(out_dir / f"{sign}.json", "w", encoding="utf-8") as f:
+            json.dump(artifact, f, ensure_ascii=False, indent=2)
+
+        return artifact
+
     async def run(self, *, date: str, interpreters: List[str], signs: List[str] | None = None) -> Dict[str, Dict]:
+        artifacts = await self.run_artifacts(date=date, interpreters=interpreters, signs=signs)
+        return {sign: artifact["final"] for sign, artifact in artifacts.items()}
+
+    async def run_artifacts(self, *, date: str, interpreters: List[str], signs: List[str] | None = None) -> Dict[str, Dict]:
+        """Como `run`, pero devuelve el artefacto completo por signo (sources, summaries, final)."""
         os.makedirs("data/summaries", exist_ok=True)
         out_dir = Path("data/summaries") / date
         out_dir.mkdir(parents=True, exist_ok=True)
@@ -52,20 +139,7 @@ class HoroscopeReactAgent:
 
         async def limited_scrape(sign: str, dt: str, interp: str) -> Tuple[str, Dict]:
             async with sem:
-                try:
-                    result = await asyncio.wait_for(self._scrape_one(sign, dt, interp), timeout=45)
-                except asyncio.TimeoutError:
-                    msg = "Timeout"
-                    self.logger.log(observation=f"Scrape timeout", metadata={"sign": sign, "interpreter": interp})
-                    print(f"[SCRAPE ⏱️] {sign} @ {interp} -> Timeout")
-                    result = {
-                        "sign": sign,
-                        "date": dt,
-                        "interpreter": interp,
-                        "source_url": None,
-                        "raw_text": "",
-                        "error": msg,
-                    }
+                result = await self._scrape_with_timeout(sign, dt, interp)
                 return interp, result
 
         # Scrape with throttling
@@ -84,7 +158,7 @@ class HoroscopeReactAgent:
                 per_sign_texts[sign].append(result)
 
         # Summarize and consolidate
-        final_per_sign: Dict[str, Dict] = {}
+        artifacts: Dict[str, Dict] = {}
         for sign in signs:
             summaries = []
             for item in per_sign_texts[sign]:
@@ -93,31 +167,8 @@ class HoroscopeReactAgent:
                 s["interpreter"] = item.get("interpreter")
                 summaries.append(s)
 
-            combined_text = "\n\n".join([x.get("final_summary", "") for x in summaries if x.get("final_summary")])
-            if combined_text:
-                consolidated = self._summarize_one(combined_text, sign, "consolidated")
-            else:
-                consolidated = {"tone": "", "facets": {"love": "", "career": "", "health": ""}, "key_points": [], "final_summary": ""}
-
-            artifact = {
-                "sign": sign,
-                "date": date,
-                "sources": [
-                    {
-                        "interpreter": i.get("interpreter"),
-                        "source_url": i.get("source_url"),
-                    }
-                    for i in per_sign_texts[sign]
-                ],
-                "summaries": summaries,
-                "final": consolidated,
-            }
-
-            with open(out_dir / f"{sign}.json", "w", encoding="utf-8") as f:
-                json.dump(artifact, f, ensure_ascii=False, indent=2)
-
-            final_per_sign[sign] = artifact["final"]
+            artifacts[sign] = self._consolidate_artifact(sign, date, per_sign_texts[sign], summaries, out_dir)
 
         self.logger.log(final_answer=f"Proceso completado para {len(signs)} signos en {date}")
         print(f"[DONE] {len(signs)} signos procesados para {date}")
-        return final_per_sign
+        return artifacts
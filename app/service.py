@@ -0,0 +1,316 @@
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from dotenv import load_dotenv
+
+from app.analysis.report_agent import generate_final_report
+from app.embeddings.analyze import analyze_embeddings
+from app.embeddings.build_embeddings import build_embeddings
+from app.embeddings.storage import STORAGE_FORMATS
+from app.react_agent import HoroscopeReactAgent
+from app.utils.signs import SIGNS
+from app.utils.singleflight import SingleFlight
+
+
+DEFAULT_INTERPRETERS = ["horoscope.com", "astrology.com"]
+
+
+class ServiceError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class _LRUCache:
+    # Bounded, thread-safe mapping for the resident caches (least recently used entries go first)
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max(1, int(max_entries))
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+
+class HoroscopeService:
+    """
+    Mantiene residentes el agente (pools HTTP y cliente OpenAI), los artefactos por signo y los embeddings,
+    y coalesce peticiones idénticas concurrentes para que una ráfaga dispare un solo scrape+summarize.
+    """
+
+    def __init__(
+        self,
+        *,
+        scrape_mode: str = "requests",
+        consolidate_mode: str = "llm",
+        max_concurrency: int = 4,
+        summaries_dir: str = "data/summaries",
+        max_artifacts: int = 1024,
+        max_embeddings: int = 64,
+    ) -> None:
+        stamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+        self.agent = HoroscopeReactAgent(
+            f"data/logs/service_{stamp}.jsonl",
+            max_concurrency=max_concurrency,
+            scrape_mode=scrape_mode,
+            consolidate_mode=consolidate_mode,
+        )
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.summaries_dir = Path(summaries_dir)
+        # Bounded so a long-running daemon does not grow without limit (one artifact per date/sign/interpreters)
+        self._artifacts = _LRUCache(max_artifacts)
+        self._embeddings = _LRUCache(max_embeddings)
+        self._flight = SingleFlight()
+        # PCA/KMeans plots go through pyplot, which is not thread-safe
+        self._analysis_lock = threading.Lock()
+
+    def _artifact_path(self, date: str, sign: str) -> Path:
+        return self.summaries_dir / date / f"{sign}.json"
+
+    def _load_artifact(self, date: str, sign: str) -> Optional[Dict]:
+        path = self._artifact_path(date, sign)
+        if not path.exists():
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _compute_artifact(self, date: str, sign: str, interpreters: List[str]) -> Dict:
+        # Use what the agent returns: the file on disk is shared by every interpreter set and may be
+        # overwritten by a concurrent compute before we could read it back
+        artifacts = asyncio.run(self.agent.run_artifacts(date=date, interpreters=interpreters, signs=[sign]))
+        artifact = artifacts.get(sign)
+        if artifact is None:
+            raise ServiceError(500, f"No artifact produced for {sign} on {date}")
+        # Cached before SingleFlight releases the key, so a request arriving right after does not recompute.
+        # An artifact without sources means every scrape failed: serve it but retry on the next request
+        if artifact.get("sources"):
+            self._artifacts.put((date, sign, tuple(interpreters)), artifact)
+        return artifact
+
+    def get_horoscope(
+        self, date: str, sign: str, *, interpreters: Optional[List[str]] = None, refresh: bool = False
+    ) -> Tuple[Dict, str]:
+        """Devuelve (artefacto, origen) con origen en 'memory' | 'disk' | 'computed' | 'shared'."""
+        _validate_date(date)
+        sign = sign.lower()
+        if sign not in SIGNS:
+            raise ServiceError(404, f"Unknown sign: {sign}")
+        interpreters = list(interpreters or DEFAULT_INTERPRETERS)
+        key = (date, sign, tuple(interpreters))
+
+        if not refresh:
+            artifact = self._artifacts.get(key)
+            if artifact is not None:
+                return artifact, "memory"
+            artifact = self._load_artifact(date, sign)
+            # The file holds whichever interpreter set ran last; only reuse it if it matches this request
+            if artifact is not None and _artifact_interpreters(artifact) == set(interpreters):
+                self._artifacts.put(key, artifact)
+                return artifact, "disk"
+
+        artifact, shared = self._flight.do(("horoscope",) + key, lambda: self._compute_artifact(date, sign, interpreters))
+        return artifact, "shared" if shared else "computed"
+
+    def _embed(self, sign_to_text: Dict[str, str], dimensions: Optional[int], storage: Optional[str]) -> Tuple[Dict, str]:
+        key = ("embeddings", dimensions, storage, tuple(sorted(sign_to_text.items())))
+        cached = self._embeddings.get(key)
+        if cached is not None:
+            return cached, "memory"
+
+        def compute() -> Dict:
+            embeddings_by_model = build_embeddings(sign_to_text, dimensions=dimensions, storage=storage)
+            self._embeddings.put(key, embeddings_by_model)
+            return embeddings_by_model
+
+        embeddings_by_model, shared = self._flight.do(key, compute)
+        return embeddings_by_model, "shared" if shared else "computed"
+
+    def analyze(
+        self,
+        date: str,
+        *,
+        signs: Optional[List[str]] = None,
+        interpreters: Optional[List[str]] = None,
+        dimensions: Optional[int] = None,
+        storage: Optional[str] = None,
+        report: bool = False,
+        report_model: Optional[str] = None,
+    ) -> Dict:
+        _validate_date(date)
+        if storage is not None and storage not in STORAGE_FORMATS:
+            raise ServiceError(400, f"Invalid storage: {storage} (expected one of {list(STORAGE_FORMATS)})")
+        if dimensions is not None and (isinstance(dimensions, bool) or not isinstance(dimensions, int) or dimensions <= 0):
+            raise ServiceError(400, f"Invalid dimensions: {dimensions!r} (expected a positive integer)")
+        signs = [s.lower() for s in (signs or SIGNS)]
+        unknown = [s for s in signs if s not in SIGNS]
+        if unknown:
+            raise ServiceError(404, f"Unknown signs: {unknown}")
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+            artifacts = list(pool.map(lambda s: self.get_horoscope(date, s, interpreters=interpreters)[0], signs))
+        sign_to_text = {s: (a.get("final", {}).get("final_summary") or "") for s, a in zip(signs, artifacts)}
+        embeddings_by_model, embeddings_source = self._embed(sign_to_text, dimensions, storage)
+
+        with self._analysis_lock:
+            # build_embeddings orders rows by sorted sign name
+            analysis = analyze_embeddings(embeddings_by_model, signs=sorted(sign_to_text))
+            report_path = None
+            if report:
+                report_path = generate_final_report(
+                    date, "outputs/analysis_report.json", f"outputs/final_analysis_{date}.md", model=report_model
+                )
+        return {"date": date, "embeddings": embeddings_source, "analysis": analysis, "report_path": report_path}
+
+
+def _artifact_interpreters(artifact: Dict) -> set:
+    return {s.get("interpreter") for s in artifact.get("sources") or []}
+
+
+def _validate_date(date: str) -> None:
+    try:
+        datetime.strptime(date, "%Y-%m-%d")
+    except ValueError:
+        raise ServiceError(400, f"Invalid date (expected YYYY-MM-DD): {date}")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "HoroscopeService/1.0"
+
+    @property
+    def service(self) -> HoroscopeService:
+        return self.server.service  # type: ignore[attr-defined]
+
+    def _send_json(self, status: int, payload: Dict) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _dispatch(self, fn) -> None:
+        started = time.perf_counter()
+        try:
+            payload = fn()
+            payload["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            self._send_json(200, payload)
+        except ServiceError as e:
+            self._send_json(e.status, {"error": str(e)})
+        except Exception as e:
+            self._send_json(500, {"error": f"{type(e).__name__}: {e}"})
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        parts = [p for p in url.path.split("/") if p]
+        query = parse_qs(url.query)
+
+        if parts == ["health"]:
+            self._send_json(200, {"status": "ok"})
+            return
+
+        if len(parts) == 3 and parts[0] == "horoscope":
+            interpreters = [i for v in query.get("interpreters", []) for i in v.split(",") if i] or None
+            refresh = query.get("refresh", ["0"])[0] in ("1", "true", "yes")
+
+            def handle() -> Dict:
+                artifact, source = self.service.get_horoscope(parts[1], parts[2], interpreters=interpreters, refresh=refresh)
+                return {"cache": source, **artifact}
+
+            self._dispatch(handle)
+            return
+
+        self._send_json(404, {"error": f"Not found: {url.path}"})
+
+    def do_POST(self) -> None:
+        url = urlparse(self.path)
+        if url.path.rstrip("/") != "/analyze":
+            self._send_json(404, {"error": f"Not found: {url.path}"})
+            return
+
+        def handle() -> Dict:
+            length = int(self.headers.get("Content-Length") or 0)
+            try:
+                body = json.loads(self.rfile.read(length) or b"{}") if length else {}
+            except json.JSONDecodeError:
+                raise ServiceError(400, "Body must be JSON")
+            if "date" not in body:
+                raise ServiceError(400, "Missing 'date'")
+            return self.service.analyze(
+                body["date"],
+                signs=body.get("signs"),
+                interpreters=body.get("interpreters"),
+                dimensions=body.get("dimensions"),
+                storage=body.get("storage"),
+                report=bool(body.get("report", False)),
+                report_model=body.get("report_model"),
+            )
+
+        self._dispatch(handle)
+
+    def log_message(self, format: str, *args) -> None:
+        print(f"[HTTP] {self.address_string()} {format % args}")
+
+
+def serve(service: HoroscopeService, *, host: str = "127.0.0.1", port: int = 8000) -> None:
+    httpd = ThreadingHTTPServer((host, port), _Handler)
+    httpd.daemon_threads = True
+    httpd.service = service  # type: ignore[attr-defined]
+    print(f"[SERVE] http://{host}:{port} (GET /horoscope/<date>/<sign>, POST /analyze)")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Servicio HTTP residente del agente de horóscopos")
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--scrape-mode", choices=["auto", "browser", "requests"], default="requests")
+    parser.add_argument("--consolidate", choices=["llm", "local"], default="llm")
+    parser.add_argument("--max-concurrency", type=int, default=4, help="Signos procesados en paralelo por /analyze")
+    parser.add_argument("--max-artifacts", type=int, default=1024, help="Artefactos (fecha, signo, intérpretes) en memoria")
+    parser.add_argument("--max-embeddings", type=int, default=64, help="Conjuntos de embeddings en memoria")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    os.makedirs("data/logs", exist_ok=True)
+    load_dotenv()
+    service = HoroscopeService(
+        scrape_mode=args.scrape_mode,
+        consolidate_mode=args.consolidate,
+        max_concurrency=args.max_concurrency,
+        max_artifacts=args.max_artifacts,
+        max_embeddings=args.max_embeddings,
+    )
+    serve(service, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
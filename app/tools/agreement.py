@@ -0,0 +1,70 @@
+import argparse
+import json
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+from app.embeddings.build_embeddings import embed_texts
+from app.tools.consolidate import _source_text
+
+
+# Cosine on text-embedding-3-small vectors: unlike bag-of-words it does not drop to ~0 when one source
+# answers in English and the other in Spanish. The LLM is only for sources that disagree *strongly*, so the
+# threshold sits at the bottom of the domain baseline: in data/embeddings_text-embedding-3-small.npy
+# (2025-11-02) the least similar pair of horoscopes for *different* signs scores 0.34 (p5 0.48, median 0.62).
+# Two sources for the same sign that are further apart than any two different readings are treated as
+# disagreeing; anything closer is consolidated locally.
+DEFAULT_AGREEMENT_THRESHOLD = 0.35
+
+
+def _mean_pairwise_cosine(vectors: np.ndarray) -> float:
+    n = len(vectors)
+    if n < 2:
+        return 1.0
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    unit = vectors / np.where(norms == 0, 1.0, norms)
+    sims = unit @ unit.T
+    return float(sims[np.triu_indices(n, 1)].mean())
+
+
+def _agreement_text(summary: Dict) -> str:
+    # Same text the stability analysis embeds, so its build_source_embeddings call hits the cache
+    return (summary.get("final_summary") or "").strip() or _source_text(summary) or " "
+
+
+def source_agreement(summaries: List[Dict]) -> float:
+    """Similitud coseno media entre embeddings de los resúmenes por fuente; 1.0 con una sola fuente."""
+    if len(summaries) < 2:
+        return 1.0
+    return _mean_pairwise_cosine(embed_texts([_agreement_text(s) for s in summaries]))
+
+
+def calibrate(summaries_dir: str, threshold: float = DEFAULT_AGREEMENT_THRESHOLD) -> Dict:
+    """Acuerdo por signo sobre los artefactos de data/summaries/<date> y tasa de fallback al LLM con `threshold`."""
+    per_sign: Dict[str, float] = {}
+    for path in sorted(Path(summaries_dir).glob("*.json")):
+        with open(path, "r", encoding="utf-8") as f:
+            summaries = json.load(f).get("summaries", [])
+        if len(summaries) >= 2:
+            per_sign[path.stem] = round(source_agreement(summaries), 3)
+    fallbacks = sorted(s for s, a in per_sign.items() if a < threshold)
+    return {
+        "threshold": threshold,
+        "multi_source_signs": len(per_sign),
+        "fallbacks": fallbacks,
+        "fallback_rate": len(fallbacks) / len(per_sign) if per_sign else 0.0,
+        "agreement": per_sign,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Calibra el umbral de acuerdo entre fuentes sobre data/summaries/<date>")
+    parser.add_argument("summaries_dir", type=str)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_AGREEMENT_THRESHOLD)
+    args = parser.parse_args()
+    print(json.dumps(calibrate(args.summaries_dir, args.threshold), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+import math
+import re
+import unicodedata
+from collections import Counter
+from itertools import zip_longest
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_SENTENCE_RE = re.compile(r"(?<=[.!?¡¿])\s+")
+
+# Short bilingual stopword list: sources come in English and Spanish
+_STOPWORDS = {
+    "the", "and", "for", "you", "your", "are", "with", "this", "that", "from", "will", "may", "can", "have",
+    "los", "las", "del", "una", "con", "por", "para", "que", "tus", "sus", "este", "esta", "como", "mas",
+}
+_PLACEHOLDERS = {"n/a", "na", "none", "-", "ninguno", "no disponible"}
+
+
+def _normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text.lower())
+    return "".join(ch for ch in text if not unicodedata.combining(ch))
+
+
+def _tokens(text: str) -> List[str]:
+    return [t for t in _WORD_RE.findall(_normalize(text)) if len(t) > 2 and t not in _STOPWORDS]
+
+
+def _vector(text: str) -> Counter:
+    return Counter(_tokens(text))
+
+
+def _cosine(a: Counter, b: Counter) -> float:
+    if not a or not b:
+        return 0.0
+    dot = sum(v * b.get(k, 0) for k, v in a.items())
+    na = math.sqrt(sum(v * v for v in a.values()))
+    nb = math.sqrt(sum(v * v for v in b.values()))
+    return dot / (na * nb) if na and nb else 0.0
+
+
+def _sentences(text: str) -> List[str]:
+    return [s.strip() for s in _SENTENCE_RE.split(text or "") if s.strip()]
+
+
+def _clean(items: List[str]) -> List[str]:
+    stripped = [(item or "").strip() for item in items]
+    return [item for item in stripped if item and item.lower() not in _PLACEHOLDERS]
+
+
+def _dedupe(
+    items: List[str],
+    threshold: float,
+    *,
+    semantic: Optional[Dict[str, np.ndarray]] = None,
+    semantic_threshold: float = 0.85,
+) -> List[str]:
+    # semantic: unit-norm embedding per item; catches duplicates across languages that bag-of-words misses
+    kept: List[str] = []
+    kept_vecs: List[Counter] = []
+    for item in _clean(items):
+        vec = _vector(item)
+        norm = _normalize(item)
+
+        def same(k: str, kv: Counter) -> bool:
+            if _normalize(k) == norm or _cosine(vec, kv) >= threshold:
+                return True
+            return semantic is not None and float(semantic[item] @ semantic[k]) >= semantic_threshold
+
+        if any(same(k, kv) for k, kv in zip(kept, kept_vecs)):
+            continue
+        kept.append(item)
+        kept_vecs.append(vec)
+    return kept
+
+
+def _source_text(summary: Dict) -> str:
+    return " ".join([summary.get("final_summary") or ""] + [str(k) for k in summary.get("key_points") or []])
+
+
+def select_sentences(texts: List[str], *, max_sentences: int = 2, diversity: float = 0.3) -> List[str]:
+    """Selección extractiva por MMR: cercanía al centroide menos redundancia con lo ya elegido."""
+    sentences = [s for t in texts for s in _sentences(t)]
+    vecs = [_vector(s) for s in sentences]
+    centroid: Counter = Counter()
+    for v in vecs:
+        norm = math.sqrt(sum(x * x for x in v.values())) or 1.0
+        for k, x in v.items():
+            centroid[k] += x / norm
+
+    selected: List[int] = []
+    candidates = list(range(len(sentences)))
+    while candidates and len(selected) < max_sentences:
+        def mmr(i: int) -> float:
+            redundancy = max((_cosine(vecs[i], vecs[j]) for j in selected), default=0.0)
+            return (1 - diversity) * _cosine(vecs[i], centroid) - diversity * redundancy
+
+        best = max(candidates, key=mmr)
+        selected.append(best)
+        candidates.remove(best)
+    # Keep original order for readability
+    return [sentences[i] for i in sorted(selected)]
+
+
+def consolidate_local(
+    summaries: List[Dict],
+    *,
+    max_sentences: int = 2,
+    max_key_points: int = 6,
+    dedupe_threshold: float = 0.6,
+    embed: Optional[Callable[[List[str]], np.ndarray]] = None,
+    semantic_threshold: float = 0.85,
+) -> Dict:
+    """
+    Consolida resúmenes por fuente sin LLM: tono mayoritario, facets y key_points deduplicados, MMR para final_summary.
+    embed: si se pasa (textos -> matriz de embeddings), la deduplicación también une ítems con coseno
+    >= semantic_threshold, lo que detecta duplicados entre inglés y español; sin él, esos se conservan ambos.
+    """
+    tones = [_normalize(str(s.get("tone") or "")).strip() for s in summaries]
+    tone_counts = Counter(t for t in tones if t)
+    tone = ""
+    if tone_counts:
+        top = max(tone_counts.values())
+        # Ties go to the first source that used the tone
+        tone = next(str(s.get("tone") or "").strip() for s, t in zip(summaries, tones) if tone_counts.get(t) == top)
+
+    facet_values = {
+        facet: [str((s.get("facets") or {}).get(facet) or "") for s in summaries] for facet in ("love", "career", "health")
+    }
+    # Interleave sources so truncation does not favour the first interpreter
+    interleaved = [str(k) for row in zip_longest(*[s.get("key_points") or [] for s in summaries]) for k in row if k]
+
+    semantic = None
+    if embed is not None:
+        # One batched call for every facet value and key point of the sign
+        texts = list(dict.fromkeys(_clean([v for values in facet_values.values() for v in values] + interleaved)))
+        if texts:
+            vectors = embed(texts)
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            semantic = dict(zip(texts, vectors / np.where(norms == 0, 1.0, norms)))
+
+    facets = {
+        facet: "; ".join(_dedupe(values, dedupe_threshold, semantic=semantic, semantic_threshold=semantic_threshold))
+        for facet, values in facet_values.items()
+    }
+    key_points = _dedupe(interleaved, dedupe_threshold, semantic=semantic, semantic_threshold=semantic_threshold)
+
+    final_summary = " ".join(
+        select_sentences([s.get("final_summary", "") for s in summaries], max_sentences=max_sentences)
+    )
+
+    return {
+        "tone": tone,
+        "facets": facets,
+        "key_points": key_points[:max_key_points],
+        "final_summary": final_summary,
+    }
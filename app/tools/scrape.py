@@ -1,8 +1,11 @@
 import asyncio
+import codecs
 import json
 import os
+import re
 from dataclasses import dataclass
-from typing import Dict, Optional
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 
 import requests
 from bs4 import BeautifulSoup
@@ -15,6 +18,32 @@ class ScrapeResult:
     interpreter: str
     source_url: str
     raw_text: str
+    bytes_downloaded: int = 0  # bytes on the wire, before Content-Encoding is undone
+    truncated: bool = False
+
+
+_CHUNK_SIZE = 64 * 1024
+_META_CHARSET_RE = re.compile(rb"""<meta[^>]+charset=["']?([A-Za-z0-9_.:-]+)""", re.IGNORECASE)
+# Lookahead instead of \b so "<article" at the end of a chunk is not taken for a tag before we see the next char
+_ARTICLE_TAG_RE = re.compile(r"<(/?)article(?=[\s>/])", re.IGNORECASE)
+_TAG_OVERLAP = 16  # longer than "</article" plus the lookahead char
+
+
+def _max_bytes() -> int:
+    return int(os.getenv("SCRAPE_MAX_BYTES", str(2 * 1024 * 1024)))
+
+
+@lru_cache(maxsize=1)
+def _session() -> requests.Session:
+    # Shared keep-alive pool; sized for the thread fan-out of asyncio.to_thread
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=8, pool_maxsize=32)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["User-Agent"] = (
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36"
+    )
+    return session
 
 
 def _interpreter_url(sign: str, interpreter: str) -> Optional[str]:
@@ -68,19 +97,106 @@ async def _scrape_with_browser_use(url: str, sign: str, date: str, interpreter:
     return None
 
 
-def _scrape_with_requests(url: str, sign: str, date: str, interpreter: str) -> Optional[ScrapeResult]:
+def _response_encoding(resp: requests.Response, head: bytes) -> str:
+    # Charset from the Content-Type header, else from a <meta> tag in the first chunk, else UTF-8
+    if "charset" in (resp.headers.get("Content-Type") or "").lower() and resp.encoding:
+        candidate = resp.encoding
+    else:
+        m = _META_CHARSET_RE.search(head)
+        candidate = m.group(1).decode("ascii") if m else "utf-8"
     try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36"
-        }
-        resp = requests.get(url, headers=headers, timeout=15)
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
-        container = soup.find("article") or soup.find("main") or soup.find("div", attrs={"id": "content"}) or soup
-        text = container.get_text(" ", strip=True)
-        if not text:
+        return codecs.lookup(candidate).name
+    except LookupError:
+        return "utf-8"
+
+
+def _wire_bytes(resp: requests.Response, decoded: int) -> int:
+    # urllib3 counts bytes read off the socket before gzip/deflate is undone; iter_content chunks are decoded
+    tell = getattr(resp.raw, "tell", None)
+    return tell() if callable(tell) else decoded
+
+
+def _read_capped(resp: requests.Response, max_bytes: int) -> Tuple[str, int, bool]:
+    """
+    Descarga en streaming como mucho `max_bytes` bytes, tanto de red (comprimidos si el servidor usa gzip)
+    como decodificados, y corta en cuanto se cierra el primer <article> (respetando anidamiento), que es el
+    bloque que `_extract_text` elegiría. Devuelve (html desde ese bloque, bytes de red leídos, truncado).
+    """
+    decoder = None
+    parts: List[str] = []
+    size = 0  # chars accumulated in parts
+    tail = ""  # last chars of the previous chunk, so tags split across chunks are still found
+    decoded = 0
+    wire = 0
+    block_start = -1
+    depth = 0
+    tag_scan_from = 0  # absolute position after the last tag counted; the overlap must not count it twice
+    closed = False
+    truncated = False
+
+    for chunk in resp.iter_content(chunk_size=_CHUNK_SIZE):
+        if not chunk:
+            continue
+        # Decoded cap: with gzip a few KB on the wire can expand to MBs of HTML
+        if decoded + len(chunk) > max_bytes:
+            chunk = chunk[: max_bytes - decoded]
+            truncated = True
+        decoded += len(chunk)
+        wire = _wire_bytes(resp, decoded)
+        if decoder is None:
+            decoder = codecs.getincrementaldecoder(_response_encoding(resp, chunk))(errors="replace")
+        text = decoder.decode(chunk)
+        parts.append(text)
+        # Only the new text (plus the overlap) is scanned, so the work per chunk stays constant
+        window = tail + text
+        offset = size - len(tail)
+        size += len(text)
+        tail = window[-_TAG_OVERLAP:]
+
+        for m in _ARTICLE_TAG_RE.finditer(window):
+            start = offset + m.start()
+            if start < tag_scan_from:
+                continue
+            tag_scan_from = offset + m.end()
+            if not m.group(1):
+                if block_start < 0:
+                    block_start = start
+                depth += 1
+            elif depth > 0:
+                depth -= 1
+                if depth == 0:
+                    closed = True
+                    break
+        if closed:
+            break
+        if truncated or wire >= max_bytes:
+            truncated = True
+            break
+
+    if decoder is not None:
+        parts.append(decoder.decode(b"", final=True))
+    html = "".join(parts)
+    # Parse only from the article onwards when we found one
+    return (html[block_start:] if block_start >= 0 else html), wire, truncated
+
+
+def _extract_text(html: str) -> str:
+    soup = BeautifulSoup(html, "html.parser")
+    container = soup.find("article") or soup.find("main") or soup.find("div", attrs={"id": "content"}) or soup
+    return " ".join(container.get_text(" ", strip=True).split())
+
+
+def _scrape_with_requests(
+    url: str, sign: str, date: str, interpreter: str, *, max_bytes: Optional[int] = None
+) -> Optional[ScrapeResult]:
+    try:
+        # The context manager releases the streamed connection on every path, including raise_for_status
+        with _session().get(url, timeout=15, stream=True) as resp:
+            resp.raise_for_status()
+            html, n_bytes, truncated = _read_capped(resp, max_bytes or _max_bytes())
+        cleaned = _extract_text(html)
+        if not cleaned:
             return None
-        cleaned = " ".join(text.split())
         if len(cleaned) > 5000:
             cleaned = cleaned[:5000]
         return ScrapeResult(
@@ -89,17 +205,22 @@ def _scrape_with_requests(url: str, sign: str, date: str, interpreter: str) -> O
             interpreter=interpreter,
             source_url=url,
             raw_text=cleaned,
+            bytes_downloaded=n_bytes,
+            truncated=truncated,
         )
     except Exception:
         return None
 
 
-async def scrape(sign: str, date: str, interpreter: str, *, mode: str = "auto") -> Dict:
+async def scrape(
+    sign: str, date: str, interpreter: str, *, mode: str = "auto", max_bytes: Optional[int] = None
+) -> Dict:
     """
     mode: 'auto' | 'browser' | 'requests'
     - auto: usa browser-use si hay API key, si no, requests
     - browser: fuerza browser-use
     - requests: fuerza HTTP requests
+    max_bytes: tope de descarga para requests (default SCRAPE_MAX_BYTES o 2 MiB)
     """
     url = _interpreter_url(sign, interpreter)
     if not url:
@@ -125,9 +246,9 @@ async def scrape(sign: str, date: str, interpreter: str, *, mode: str = "auto")
         result = await _scrape_with_browser_use(url, sign, date, interpreter)
         if not result:
             # fallback silently
-            result = await asyncio.to_thread(_scrape_with_requests, url, sign, date, interpreter)
+            result = await asyncio.to_thread(_scrape_with_requests, url, sign, date, interpreter, max_bytes=max_bytes)
     else:
-        result = await asyncio.to_thread(_scrape_with_requests, url, sign, date, interpreter)
+        result = await asyncio.to_thread(_scrape_with_requests, url, sign, date, interpreter, max_bytes=max_bytes)
 
     if not result:
         return {
@@ -145,4 +266,6 @@ async def scrape(sign: str, date: str, interpreter: str, *, mode: str = "auto")
         "interpreter": result.interpreter,
         "source_url": result.source_url,
         "raw_text": result.raw_text,
+        "bytes": result.bytes_downloaded,
+        "truncated": result.truncated,
     }
@@ -0,0 +1,94 @@
+import gzip
+from typing import Iterator
+
+from app.tools.scrape import _CHUNK_SIZE, _extract_text, _read_capped
+
+
+# Regression checks for the streaming reader, with in-memory responses (no network). Each case compares
+# the text extracted from the streamed prefix with the text extracted from the whole document.
+FILLER = "<p>" + "lorem ipsum dolor sit amet " * 40 + "</p>\n"
+GAP = FILLER * 100  # > 64 KiB, so the tags land in different chunks
+
+
+class _FakeRaw:
+    def __init__(self) -> None:
+        self.read = 0
+
+    def tell(self) -> int:
+        return self.read
+
+
+class _FakeResponse:
+    """Imita requests.Response en streaming; con `compressed`, raw.tell() cuenta bytes gzip como urllib3."""
+
+    def __init__(self, body: bytes, *, compressed: bool = False) -> None:
+        self.body = body
+        self.headers = {"Content-Type": "text/html; charset=utf-8"}
+        self.encoding = "utf-8"
+        self.wire_total = len(gzip.compress(body)) if compressed else len(body)
+        self.raw = _FakeRaw()
+        self.chunks_served = 0
+
+    def iter_content(self, chunk_size: int) -> Iterator[bytes]:
+        for i in range(0, len(self.body), chunk_size):
+            chunk = self.body[i : i + chunk_size]
+            self.chunks_served += 1
+            # Wire bytes grow proportionally to decoded bytes
+            self.raw.read = self.wire_total * (i + len(chunk)) // len(self.body)
+            yield chunk
+
+
+def _check(name: str, html: str, *, expect: str, max_bytes: int = 10**9, must_stop_early: bool = True) -> None:
+    body = html.encode("utf-8")
+    resp = _FakeResponse(body)
+    prefix, _, _ = _read_capped(resp, max_bytes)
+    got = _extract_text(prefix)
+    assert got == _extract_text(html), f"{name}: streamed text differs from full-document text: {got[:80]!r}"
+    assert expect in got, f"{name}: {expect!r} missing from {got[:80]!r}"
+    if must_stop_early:
+        assert resp.chunks_served < -(-len(body) // _CHUNK_SIZE), f"{name}: read the whole document"
+
+
+def run_selfcheck() -> None:
+    """Levanta AssertionError si el lector en streaming elige otro bloque que el parseo del documento completo."""
+    _check(
+        "nested article",
+        f"<html><body><article><h1>Aries</h1>{GAP}<article>related</article>{GAP}REAL TEXT</article>{GAP}</body></html>",
+        expect="REAL TEXT",
+    )
+    _check(
+        "main before article",
+        f"<html><body><main>nav</main>{GAP}<article>horoscope</article>{GAP}</body></html>",
+        expect="horoscope",
+    )
+    _check(
+        "main only",
+        f"<html><body><main>only main</main>{GAP}</body></html>",
+        expect="only main",
+        must_stop_early=False,
+    )
+    _check(
+        "articles prefix is not a tag",
+        f"<html><body><articles>x</articles>{GAP}<article>real</article>{GAP}</body></html>",
+        expect="real",
+    )
+    # Every split point of the opening and closing tags across a chunk boundary
+    for cut in range(1, 12):
+        pad = "x" * (_CHUNK_SIZE - cut)
+        _check(f"open tag split at {cut}", f"{pad}<article>hi</article>{GAP}", expect="hi")
+        pad = "x" * (_CHUNK_SIZE - len("<article>hi") - cut)
+        _check(f"close tag split at {cut}", f"{pad}<article>hi</article>{GAP}", expect="hi")
+
+    # Decoded cap: a highly compressible page reads few bytes on the wire but must not be built in full
+    body = (f"<html><body>{FILLER * 5000}</body></html>").encode("utf-8")
+    resp = _FakeResponse(body, compressed=True)
+    html, wire, truncated = _read_capped(resp, 256 * 1024)
+    assert truncated, "decoded cap not applied"
+    assert len(html.encode("utf-8")) <= 256 * 1024, len(html)
+    assert wire < 256 * 1024, "wire bytes should report the compressed size"
+
+    print("[SELFCHECK ✅] scrape: anidamiento de <article>, <main> previo, tags partidos entre chunks y tope decodificado")
+
+
+if __name__ == "__main__":
+    run_selfcheck()
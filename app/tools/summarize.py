@@ -1,5 +1,6 @@
 import json
 import os
+from functools import lru_cache
 from typing import Dict
 
 from dotenv import load_dotenv
@@ -9,7 +10,9 @@ from openai import OpenAI
 load_dotenv()
 
 
+@lru_cache(maxsize=1)
 def _client() -> OpenAI:
+    # Cached so the HTTP connection pool is reused across summaries
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
         raise RuntimeError("OPENAI_API_KEY is required")
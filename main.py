@@ -8,6 +8,7 @@ from dotenv import load_dotenv
 
 from app.embeddings.analyze import analyze_embeddings
 from app.embeddings.build_embeddings import build_embeddings
+from app.embeddings.stability import run_stability_analysis
 from app.react_agent import HoroscopeReactAgent
 from app.utils.signs import SIGNS
 from app.analysis.report_agent import generate_final_report
@@ -40,6 +41,36 @@ def parse_args() -> argparse.Namespace:
         default=2,
         help="Máximo de scrapes concurrentes (para evitar abrir demasiadas pestañas)",
     )
+    parser.add_argument(
+        "--scrape-max-bytes",
+        type=int,
+        default=None,
+        help="Tope de bytes descargados por página en modo requests (default SCRAPE_MAX_BYTES o 2 MiB)",
+    )
+    parser.add_argument(
+        "--consolidate",
+        choices=["llm", "local"],
+        default="llm",
+        help="'llm' consolida cada signo con summarize(); 'local' usa selección extractiva y solo llama al LLM si las fuentes discrepan",
+    )
+    parser.add_argument(
+        "--embed-dimensions",
+        type=int,
+        default=None,
+        help="Dimensiones de salida de los embeddings (parámetro 'dimensions' de la API; default ancho completo)",
+    )
+    parser.add_argument(
+        "--embed-storage",
+        choices=["float32", "float16", "int8"],
+        default=None,
+        help="Formato en disco de los embeddings (default OPENAI_EMBED_STORAGE o float32)",
+    )
+    parser.add_argument(
+        "--stability-resamples",
+        type=int,
+        default=2000,
+        help="Remuestreos bootstrap/permutación para intérprete vs. modelo de embedding (0 = omitir)",
+    )
     parser.add_argument(
         "--report-model",
         type=str,
@@ -58,19 +89,33 @@ async def main_async(args: argparse.Namespace) -> None:
 
     print(
         f"[RUN] date={args.date} interpreters={args.interpreters} signs={len(args.signs)} "
-        f"mode={args.scrape_mode} concurrency={args.max_concurrency}\nLog: {log_path}"
+        f"mode={args.scrape_mode} concurrency={args.max_concurrency} consolidate={args.consolidate}\nLog: {log_path}"
     )
 
-    agent = HoroscopeReactAgent(log_path, max_concurrency=args.max_concurrency, scrape_mode=args.scrape_mode)
+    agent = HoroscopeReactAgent(
+        log_path,
+        max_concurrency=args.max_concurrency,
+        scrape_mode=args.scrape_mode,
+        consolidate_mode=args.consolidate,
+        scrape_max_bytes=args.scrape_max_bytes,
+    )
     final_per_sign = await agent.run(date=args.date, interpreters=args.interpreters, signs=args.signs)
 
     # Build embedding inputs: one final summary per sign
     sign_to_text = {sign: (final_per_sign.get(sign, {}).get("final_summary") or "") for sign in args.signs}
-    embeddings_by_model = build_embeddings(sign_to_text)
+    embeddings_by_model = build_embeddings(
+        sign_to_text, dimensions=args.embed_dimensions, storage=args.embed_storage
+    )
 
     # Analyze separability
     analysis = analyze_embeddings(embeddings_by_model, signs=args.signs)
 
+    # Interpreter vs. embedding model: per-source embeddings + bootstrap/permutation tests
+    if args.stability_resamples > 0:
+        stability = run_stability_analysis(args.date, args.signs, n_resamples=args.stability_resamples)
+        if not stability.get("error"):
+            print(f"[STABILITY] factor dominante: {stability['dominant_factor']} ({stability['elapsed_seconds']:.2f}s)")
+
     # Generate final report
     analysis_path = "outputs/analysis_report.json"
     report_path = f"outputs/final_analysis_{args.date}.md"